@@ -1,28 +1,43 @@
-from dash import Dash, html, dcc, callback, Output, Input
+from dash import Dash, html, dcc, callback, clientside_callback, ClientsideFunction, Output, Input
 import dash_bootstrap_components as dbc
 from applications.asce import asceApp
 from applications.tbec import tbecApp
 from applications.seisscale import seisscaleApp
 from applications.eqprocess import processorApp
+from applications.eqprocess.uploadRoutes import registerUploadRoutes
+from components.jobs import backgroundManager
 
-app = Dash(__name__, suppress_callback_exceptions=True, title="SeisKit", external_stylesheets=[dbc.themes.SANDSTONE])
+# heavy callbacks run as background jobs, see components/jobs.py
+app = Dash(__name__, suppress_callback_exceptions=True, title="SeisKit", external_stylesheets=[dbc.themes.SANDSTONE],
+           background_callback_manager=backgroundManager)
 server = app.server
 
+# chunked upload route of the earthquake data processor
+registerUploadRoutes(server)
+
 app.layout = html.Div([
     dcc.Location(id='url', refresh=True),
     dcc.Location(id='redirect', refresh=True),
     html.Div(id='page-content'),
 ])
 
-@callback(
+# the homepage redirect runs in the browser (assets/clientside.js)
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='redirect'),
     Output('redirect', 'href', allow_duplicate=True),
+    [Input('url', 'pathname')],
+    prevent_initial_call=True
+)
+
+# page layouts are built on the server
+@callback(
     Output('page-content', 'children'),
     [Input('url', 'pathname')],
     prevent_initial_call=True
 )
 def display_page(pathname):
     if pathname in ['/', '/home']:
-        return 'https://seiskit.com/applications', None
+        return None
     elif pathname == '/tbecapp':
         content = tbecApp.layout()
     elif pathname == '/asceapp':
@@ -34,7 +49,7 @@ def display_page(pathname):
     else:
         content = '404 Page Not Found'
     
-    return None, html.Div(content)
+    return html.Div(content)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -1,5 +1,5 @@
 import dash_bootstrap_components as dbc
-from dash import dcc, html, Input, Output, State, callback
+from dash import dcc, html, Input, Output, State, callback, clientside_callback, ClientsideFunction, Patch
 from dash.exceptions import PreventUpdate
 import dash_mantine_components as dmc
 import plotly.graph_objects as go
@@ -8,6 +8,7 @@ import io
 import pandas as pd
 from applications.asce.asceFunctions import getAsceDataMulti, getAsceDataMultiMCEr, getAsceDataTwo, getAsceDataTwoMCEr
 from components.navbar import navbar
+from components.figures import figureTrace
 
 # title
 asceTitle = dmc.Text("🔹ASCE7-22 Response Spectrum", className='fs-3 mx-3 mb-3 mt-3')
@@ -160,28 +161,19 @@ def layout():
         dcc.Download(id="downloadExcel")
     ]
 
-# add marker to the map
-@callback(
+# add marker to the map, runs in the browser (assets/clientside.js)
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='clickMarker'),
     Output("asceLayer", "children"),
     [Input("usaMap", "click_lat_lng")],
 )
-def map_click(click_lat_lng):
-    if click_lat_lng:
-        marker = dl.Marker(position=click_lat_lng)
-        return [marker]
-    return []
-    
+
 # get coordinates from the click
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='clickCoordinates'),
     [Output("asceLatitudeInput", "value"), Output("asceLongitudeInput", "value")],
     [Input("usaMap", "click_lat_lng")]
 )
-def click_coord(click_lat_lng):
-    if click_lat_lng and len(click_lat_lng) == 2:
-        lat, lng = click_lat_lng
-        return float(round(lat, 4)), float(round(lng, 4))
-    else:
-        raise PreventUpdate
     
 # update graphs
 @callback(
@@ -196,17 +188,17 @@ def click_coord(click_lat_lng):
         State('asceLatitudeInput', 'value'),
         State('asceLongitudeInput', 'value'),
         State('asceSiteCategoryInput', 'value'),
-        State('multiPeriodFig', 'figure'),
-        State('multiPeriodMcerFig', 'figure'),
-        State('twoPeriodFig', 'figure'),
-        State('twoPeriodMcerFig', 'figure'),
     ]
 )
-def updateGraphs(n_clicks, latitude, longitude, siteCategory, upMulti, upMultiMcer, upTwo, upTwoMcer):
+def updateGraphs(n_clicks, latitude, longitude, siteCategory):
     if not n_clicks:
         raise PreventUpdate
     
     # clean the graph
+    upMulti = Patch()
+    upMultiMcer = Patch()
+    upTwo = Patch()
+    upTwoMcer = Patch()
     upMulti['data'] = []
     upMultiMcer['data'] = []
     upTwo['data'] = []
@@ -236,22 +228,22 @@ def updateGraphs(n_clicks, latitude, longitude, siteCategory, upMulti, upMultiMc
     twoPeriodData = getAsceDataTwo(latitude, longitude, 'III', siteCategory, 'Call')
     twoPeriodMcerData = getAsceDataTwoMCEr(latitude, longitude, 'III', siteCategory, 'Call')
     
-    multiTrace = go.Scatter(
+    multiTrace = figureTrace(
                     x = multiData['multiPeriodDesignSpectrumPeriods'],
                     y = multiData['multiPeriodDesignSpectrumOrdinates'],
                     line=dict(color=lineColor))
     
-    multiMcerTrace = go.Scatter(
+    multiMcerTrace = figureTrace(
                     x = multiMcerData['multiPeriodMCErSpectrumPeriods'],
                     y = multiMcerData['multiPeriodMCErSpectrumOrdinates'],
                     line=dict(color=lineColor))
     
-    twoTrace = go.Scatter(
+    twoTrace = figureTrace(
                     x = twoPeriodData['twoPeriodDesignSpectrumPeriods'],
                     y = twoPeriodData['twoPeriodDesignSpectrumOrdinates'],
                     line=dict(color=lineColor))
     
-    twoMcerTrace = go.Scatter(
+    twoMcerTrace = figureTrace(
                     x = twoPeriodMcerData['twoPeriodMCErSpectrumPeriods'],
                     y = twoPeriodMcerData['twoPeriodMCErSpectrumOrdinates'],
                     line=dict(color=lineColor))
@@ -1,8 +1,8 @@
+from functools import lru_cache
 import numpy as np
 import pandas as pd
-from scipy import signal, integrate
-from numpy.fft import rfft
-from numpy import linspace
+from scipy import signal, sparse
+from scipy.fft import rfft, irfft, rfftfreq, next_fast_len
 
 def detrendFunction(data, method='linear', order=1):
     time = data['Time (s)'].values
@@ -36,14 +36,116 @@ def butterworth(filterType, cutoff, delta, order):
 
     return b, a
 
+@lru_cache(maxsize=256)
+def designSOS(filterType, cutoff, delta, order):
+    # second-order sections, cached for repeated records with the same settings
+    fn = 0.5 / delta
+    wn = [c/fn for c in cutoff] if filterType == "bandpass" else cutoff[0]/fn
+
+    sos = signal.butter(order, wn, btype = filterType, output='sos')
+
+    # the cached array is never handed out, butterworthSOS returns copies of it
+    sos.flags.writeable = False
+
+    return sos
+
+def butterworthSOS(filterType, cutoff, delta, order):
+    """
+    Butterworth filter as second-order sections, stable at high orders and low cutoffs.
+
+    Args:
+        filterType (str): 'bandpass', 'lowpass' or 'highpass'
+        cutoff (list): corner frequencies (Hz), two for bandpass
+        delta (float): sampling interval (s)
+        order (int): filter order
+    Returns:
+        np.ndarray: (n_sections, 6) sos array, a copy of the cached design
+    """
+    # rounded, so float noise in dt or the corners does not miss the cache
+    cutoff = tuple(round(float(c), 12) for c in np.atleast_1d(cutoff))
+
+    # scipy's sosfilt needs a writable array, the copy keeps the cache safe from it
+    return designSOS(filterType, cutoff, round(float(delta), 12), int(order)).copy()
+
+def filterArray(acc, filterType, cutoff, delta, order, padtype='odd', padlen=None, taper=0.0):
+    """
+    Zero phase Butterworth filter applied in place.
+
+    Args:
+        acc (np.ndarray): float acceleration array, overwritten with the filtered signal
+        filterType (str): 'bandpass', 'lowpass' or 'highpass'
+        cutoff (list): corner frequencies (Hz), two for bandpass
+        delta (float): sampling interval (s)
+        order (int): filter order
+        padtype (str): 'odd', 'even', 'constant' or None, extension at both ends
+        padlen (int): number of padded samples, None for the scipy default
+        taper (float): fraction of the record in the cosine tapers of a Tukey window, 0 for no taper
+    Returns:
+        np.ndarray: acc
+    """
+    sos = butterworthSOS(filterType, cutoff, delta, order)
+
+    # taper both ends to zero before filtering
+    if taper > 0:
+        acc *= signal.windows.tukey(len(acc), taper)
+
+    acc[:] = signal.sosfiltfilt(sos, acc, padtype=padtype, padlen=padlen)
+
+    return acc
+
 def filterFunction(data, filterType, cutoff, delta, order):
 
-    b, a = butterworth(filterType, cutoff, delta, order = order)
     dataFiltered = data.copy()
-    dataFiltered['y'] = signal.filtfilt(b, a, data['y'].values)
+    dataFiltered['y'] = filterArray(data['y'].to_numpy(dtype=float, copy=True), filterType, cutoff, delta, order)
 
     return dataFiltered
 
+# NGA-West2 flatfile periods (s)
+NGA_PERIODS = np.array([
+    0.01, 0.02, 0.022, 0.025, 0.029, 0.03, 0.032, 0.035, 0.036, 0.04, 0.042, 0.044, 0.045, 0.046, 0.048,
+    0.05, 0.055, 0.06, 0.065, 0.067, 0.07, 0.075, 0.08, 0.085, 0.09, 0.095, 0.1, 0.11, 0.12, 0.13, 0.133,
+    0.14, 0.15, 0.16, 0.17, 0.18, 0.19, 0.2, 0.22, 0.24, 0.25, 0.26, 0.28, 0.29, 0.3, 0.32, 0.34, 0.35,
+    0.36, 0.38, 0.4, 0.42, 0.44, 0.45, 0.46, 0.48, 0.5, 0.55, 0.6, 0.65, 0.667, 0.7, 0.75, 0.8, 0.85, 0.9,
+    0.95, 1.0, 1.1, 1.2, 1.3, 1.4, 1.5, 1.6, 1.7, 1.8, 1.9, 2.0, 2.2, 2.4, 2.5, 2.6, 2.8, 3.0, 3.2, 3.4,
+    3.5, 3.6, 3.8, 4.0, 4.2, 4.4, 4.6, 4.8, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5, 10.0, 11.0,
+    12.0, 13.0, 14.0, 15.0, 20.0
+])
+
+def logPeriods(tMin=0.01, tMax=10.0, n=100):
+    if tMin is None or tMax is None or n is None or not 0 < tMin < tMax or int(n) < 2:
+        raise ValueError("Period range must satisfy 0 < min < max with at least 2 periods.")
+    
+    return np.logspace(np.log10(tMin), np.log10(tMax), int(n))
+
+def userPeriods(values):
+    # accepts a sequence or a comma/space separated string of periods
+    if isinstance(values, str):
+        values = values.replace(',', ' ').split()
+    
+    periods = np.unique(np.asarray(values, dtype=float))
+    
+    if periods.size == 0 or np.any(periods <= 0):
+        raise ValueError("User-defined periods must be a non-empty list of positive values.")
+    
+    return periods
+
+def periodGrid(kind='log', tMin=0.01, tMax=10.0, n=100, values=None):
+    """
+    Args:
+        kind (str): period grid type
+            - log: n log-spaced periods between tMin and tMax
+            - nga: 111 periods of the NGA-West2 flatfile
+            - user: periods given in values
+    """
+    if kind == 'log':
+        return logPeriods(tMin, tMax, n)
+    elif kind == 'nga':
+        return NGA_PERIODS.copy()
+    elif kind == 'user':
+        return userPeriods(values)
+    else:
+        raise ValueError("Grid must be 'log', 'nga' or 'user'.")
+
 def ResponseSpectrum(T, s, z, dt):
     T = np.array(T)
     T[T == 0] = np.finfo(float).eps
@@ -55,111 +157,494 @@ def ResponseSpectrum(T, s, z, dt):
         
     return SA
 
+def pwCoefficients(T, zi, dt):
+    # piecewise-exact (Nigam-Jennings) recurrence matrices, one entry per period
+    wn = 2 * np.pi / T
+    wd = wn * (1 - zi ** 2) ** 0.5
+    
+    ex = np.exp(-zi * wn * dt)
+    cwd = np.cos(wd * dt)
+    swd = np.sin(wd * dt)
+    zisq = 1 / np.sqrt(1 - (zi ** 2))
+    
+    a11 = ex * (cwd + zi * zisq * swd)
+    a12 = (ex / wd) * swd
+    a21 = -wn * zisq * ex * swd
+    a22 = ex * (cwd - zi * zisq * swd)
+    
+    b11 = ex * (((2 * zi ** 2 - 1) / (wn ** 2 * dt) + zi / wn) * (1 / wd) * swd +
+                (2 * zi / (wn ** 3 * dt) + 1 / (wn ** 2)) * cwd) - 2 * zi / (wn ** 3 * dt)
+    b12 = -ex * (((2 * zi ** 2 - 1) / (wn ** 2 * dt)) * (1 / wd) * swd +
+                 (2 * zi / (wn ** 3 * dt)) * cwd) - 1 / (wn ** 2) + 2 * zi / (wn ** 3 * dt)
+    b21 = -((a11 - 1) / (wn ** 2 * dt)) - a12
+    b22 = -b21 - a12
+    
+    return wn, (a11, a12, a21, a22), (b11, b12, b21, b22)
+
+def pwFilter(A, B, c0, c1):
+    """
+    Converts the recurrence u[q+1] = A u[q] + B [s[q], s[q+1]] with u[0] = 0 into
+    an equivalent second order IIR filter for the output y = c0 * u[0] + c1 * u[1].
+
+    Returns:
+        num, den, init: filter coefficients with shape (nper, 3) and the initial
+            filter state per unit s[0] with shape (nper, 2)
+    """
+    a11, a12, a21, a22 = A
+    b11, b12, b21, b22 = B
+    
+    # numerator of C adj(zI - A) b for the input column b = [p, r]
+    def numerator(p, r):
+        return c0 * p + c1 * r, c0 * (a12 * r - a22 * p) + c1 * (a21 * p - a11 * r)
+    
+    n01, n00 = numerator(b11, b21)
+    n11, n10 = numerator(b12, b22)
+    
+    num = np.stack([n11, n10 + n01, n00], axis=-1)
+    den = np.stack([np.ones_like(a11), -(a11 + a22), a11 * a22 - a12 * a21], axis=-1)
+    
+    # the s[q + 1] input is not seen at q = 0, so the first sample enters through the state
+    init = np.stack([n01, n00], axis=-1)
+    
+    return num, den, init
+
+def pwHistory(num, den, init, s):
+    # response history of one period, u[0] = 0 as in the recurrence
+    y = np.zeros(np.size(s))
+    y[1:] = signal.lfilter(num, den, s[1:], zi=init * s[0])[0]
+    
+    return y
+
 def RSPW(T, s, zi, dt):
-    import numpy as np
+    T = np.asarray(T, dtype=float)
+    s = np.asarray(s, dtype=float)
     
-    pi = np.pi
     nper = np.size(T)
-    n = np.size(s)
     SA = np.zeros(nper)
     
+    # coefficients for all periods at once, absolute acceleration at = -2 wn zi v - wn^2 u
+    wn, A, B = pwCoefficients(T, zi, dt)
+    num, den, init = pwFilter(A, B, -wn ** 2, -2 * zi * wn)
+    
     for k in range(nper):
-        wn = 2 * pi / T[k]
-        wd = wn * (1 - zi ** 2) ** 0.5
-        
-        u = np.zeros((2, n))
-        
-        ex = np.exp(-zi * wn * dt)
-        cwd = np.cos(wd * dt)
-        swd = np.sin(wd * dt)
-        zisq = 1 / np.sqrt(1 - (zi ** 2))
-        
-        a11 = ex * (cwd + zi * zisq * swd)
-        a12 = (ex / wd) * swd
-        a21 = -wn * zisq * ex * swd
-        a22 = ex * (cwd - zi * zisq * swd)
-        
-        b11 = ex * (((2 * zi ** 2 - 1) / (wn ** 2 * dt) + zi / wn) * (1 / wd) * np.sin(wd * dt) +
-                    (2 * zi / (wn ** 3 * dt) + 1 / (wn ** 2)) * np.cos(wd * dt)) - 2 * zi / (wn ** 3 * dt)
-        b12 = -ex * (((2 * zi ** 2 - 1) / (wn ** 2 * dt)) * (1 / wd) * np.sin(wd * dt) +
-                     (2 * zi / (wn ** 3 * dt)) * np.cos(wd * dt)) - 1 / (wn ** 2) + 2 * zi / (wn ** 3 * dt)
-        b21 = -((a11 - 1) / (wn ** 2 * dt)) - a12
-        b22 = -b21 - a12
-        
-        A = np.array([[a11, a12], [a21, a22]])
-        B = np.array([[b11, b12], [b21, b22]])
-        
-        for q in range(n - 1):
-            u[:, q + 1] = np.dot(A, u[:, q]) + np.dot(B, np.array([s[q], s[q + 1]]))
-        
-        at = -2 * wn * zi * u[1, :] - (wn ** 2) * u[0, :]
-        
+        at = pwHistory(num[k], den[k], init[k], s)
         SA[k] = np.max(np.abs(at))
     
     return SA
 
-def RSFD(T, s, z, dt):
-    import numpy as np
-    from numpy.fft import fft, ifft
+def RSPWStates(T, s, zi, dt):
+    # relative displacement and velocity histories, absolute acceleration derived from them
+    T = np.asarray(T, dtype=float)
+    s = np.asarray(s, dtype=float)
+    
+    nper = np.size(T)
+    SD, SV, SA = np.zeros(nper), np.zeros(nper), np.zeros(nper)
+    
+    wn, A, B = pwCoefficients(T, zi, dt)
+    uFilter = pwFilter(A, B, 1.0, 0.0)
+    vFilter = pwFilter(A, B, 0.0, 1.0)
+    
+    for k in range(nper):
+        u = pwHistory(uFilter[0][k], uFilter[1][k], uFilter[2][k], s)
+        v = pwHistory(vFilter[0][k], vFilter[1][k], vFilter[2][k], s)
+        at = -2 * wn[k] * zi * v - wn[k] ** 2 * u
+        
+        SD[k] = np.max(np.abs(u))
+        SV[k] = np.max(np.abs(v))
+        SA[k] = np.max(np.abs(at))
     
-    pi = np.pi
+    return SD, SV, SA
 
+def fdRecord(s, T, z, dt):
+    # pad until the free vibration tail has decayed below 1% (at least 10 cycles) so
+    # the circular convolution does not wrap it back onto the record
+    s = np.asarray(s, dtype=float)
     npo = np.size(s)
+    
+    cycles = max(10, np.log(100) / (2 * np.pi * z))
+    n = next_fast_len(int(npo + np.ceil(cycles * np.max(T) / dt)), real=True)
+    s = np.append(s, np.zeros(n - npo))
+    
+    ww = 2 * np.pi * rfftfreq(n, dt)
+    ffts = rfft(s)
+    
+    return s, ww, ffts
+
+def RSFD(T, s, z, dt, memoryBudget=64 * 2 ** 20):
+    """
+    Frequency domain response spectrum, evaluated on blocks of periods at once.
+
+    Args:
+        memoryBudget (int): approximate number of bytes the temporaries of a block of
+            periods may occupy, the padded record itself is not counted
+    """
+    T = np.asarray(T, dtype=float)
+    
     nT = np.size(T)
     SA = np.zeros(nT)
     
-    n = int(2 ** np.ceil(np.log2(npo + 10 * np.max(T) / dt)))
-    fs = 1 / dt
-    s = np.append(s, np.zeros(n - npo))
+    s, ww, ffts = fdRecord(s, T, z, dt)
+    n = np.size(s)
+    
+    # per period: complex denominator, transfer function and its product with the
+    # record spectrum, plus the irfft output, the record subtracted from it and its abs
+    blockSize = max(1, int(memoryBudget // (48 * ww.size + 24 * n)))
     
-    fres = fs / n
-    nfrs = int(np.ceil(n / 2))
-    freqs = fres * np.arange(0, nfrs + 1, 1)
-    ww = 2 * pi * freqs
-    ffts = fft(s)
-    
-    m = 1
-    for kk in range(nT):
-        w = 2 * pi / T[kk]
-        k = m * w ** 2
-        c = 2 * z * m * w
+    for start in range(0, nT, blockSize):
+        w = 2 * np.pi / T[start:start + blockSize, np.newaxis]
         
-        H1 = 1 / (-m * ww ** 2 + k + 1j * c * ww)
-        H2 = 1j * ww / (-m * ww ** 2 + k + 1j * c * ww)
-        H3 = -ww ** 2 / (-m * ww ** 2 + k + 1j * c * ww)
+        # acceleration transfer function, m = 1, k = w^2, c = 2 z w
+        H3 = -ww ** 2 / (w ** 2 - ww ** 2 + 2j * z * w * ww)
         
-        H1 = np.append(H1, np.conj(H1[n // 2 - 1:0:-1]))
-        H1[n // 2] = np.real(H1[n // 2])
+        a = irfft(H3 * ffts, n, axis=1)
+        a -= s
+        SA[start:start + blockSize] = np.max(np.abs(a), axis=1)
+    
+    return SA
+
+def RSFDStates(T, z, fftRecord, memoryBudget=64 * 2 ** 20):
+    # same as RSFD for displacement and velocity, on a record already padded by fdRecord
+    T = np.asarray(T, dtype=float)
+    s, ww, ffts = fftRecord
+    n = np.size(s)
+    
+    nT = np.size(T)
+    SD, SV, SA = np.zeros(nT), np.zeros(nT), np.zeros(nT)
+    
+    # per period: denominator, H1 and three complex products, plus u, v, at and their abs
+    blockSize = max(1, int(memoryBudget // (80 * ww.size + 40 * n)))
+    
+    for start in range(0, nT, blockSize):
+        w = 2 * np.pi / T[start:start + blockSize, np.newaxis]
         
-        H2 = np.append(H2, np.conj(H2[n // 2 - 1:0:-1]))
-        H2[n // 2] = np.real(H2[n // 2])
+        # displacement and velocity transfer functions, acceleration follows from
+        # H3 = 1 - w^2 H1 - 2 z w H2
+        H1 = 1 / (w ** 2 - ww ** 2 + 2j * z * w * ww)
+        u = irfft(H1 * ffts, n, axis=1)
+        v = irfft(1j * ww * H1 * ffts, n, axis=1)
+        at = -w ** 2 * u - 2 * z * w * v
         
-        H3 = np.append(H3, np.conj(H3[n // 2 - 1:0:-1]))
-        H3[n // 2] = np.real(H3[n // 2])
+        SD[start:start + blockSize] = np.max(np.abs(u), axis=1)
+        SV[start:start + blockSize] = np.max(np.abs(v), axis=1)
+        SA[start:start + blockSize] = np.max(np.abs(at), axis=1)
+    
+    return SD, SV, SA
+
+def ResponseSpectra(T, s, dampings, dt, multiRate=False):
+    """
+    Computes the response spectra of several damping ratios in one call.
+
+    Args:
+        T: periods
+        s: acceleration record
+        dampings: list of damping ratios
+        dt: sampling interval
+        multiRate (bool): solve each period band at its own sampling rate, see multiRateSpectra
+
+    Returns:
+        spectra (dict): 'T' and 'damping' arrays and one (ndamping, nperiod) array per
+            quantity: 'SD', 'SV', 'PSV', 'PSA' and 'SA'
+    """
+    if multiRate:
+        return multiRateSpectra(T, s, dampings, dt)
+    
+    T = np.array(T, dtype=float)
+    T[T == 0] = np.finfo(float).eps
+    s = np.asarray(s, dtype=float)
+    dampings = np.atleast_1d(np.asarray(dampings, dtype=float))
+    
+    SD = np.zeros((dampings.size, T.size))
+    SV = np.zeros((dampings.size, T.size))
+    SA = np.zeros((dampings.size, T.size))
+    
+    # the padded record and its fft are shared by the frequency domain dampings
+    fdDampings = dampings[dampings >= 0.04]
+    if fdDampings.size:
+        fftRecord = fdRecord(s, T, np.min(fdDampings), dt)
+    
+    for i, z in enumerate(dampings):
+        if z >= 0.04:
+            SD[i], SV[i], SA[i] = RSFDStates(T, z, fftRecord)
+        else:
+            SD[i], SV[i], SA[i] = RSPWStates(T, s, z, dt)
+    
+    wn = 2 * np.pi / T
+    
+    spectra = {
+        'T': T,
+        'damping': dampings,
+        'SD': SD,
+        'SV': SV,
+        'PSV': wn * SD,
+        'PSA': wn ** 2 * SD,
+        'SA': SA
+    }
+    
+    return spectra
+
+def rateBands(T, dt, npts, pointsPerPeriod=32, minPointsPerPeriod=10):
+    """
+    Groups periods by the sampling rate they are solved at.
+
+    Periods with more than pointsPerPeriod samples per cycle are solved on the record
+    decimated by a power of two that keeps at least pointsPerPeriod samples per cycle,
+    periods with less than minPointsPerPeriod samples per cycle are solved on the record
+    oversampled by the smallest integer that restores minPointsPerPeriod.
+
+    Returns:
+        bands (list): (up, down, index) for each group of periods
+    """
+    ratio = np.asarray(T, dtype=float) / dt
+    
+    # keep at least 256 samples in the decimated record
+    maxDown = 2 ** max(0, int(np.floor(np.log2(npts / 256)))) if npts >= 256 else 1
+    
+    down = 2 ** np.floor(np.log2(np.maximum(ratio / pointsPerPeriod, 1))).astype(int)
+    down = np.minimum(down, maxDown)
+    up = np.where(ratio < minPointsPerPeriod, np.ceil(minPointsPerPeriod / ratio), 1).astype(int)
+    
+    bands = []
+    for u, d in sorted(set(zip(up.tolist(), down.tolist()))):
+        bands.append((u, d, np.flatnonzero((up == u) & (down == d))))
+    
+    return bands
+
+def multiRateSpectra(T, s, dampings, dt, pointsPerPeriod=32, minPointsPerPeriod=10):
+    """
+    ResponseSpectra with each period band solved at its own sampling rate.
+
+    Long periods are solved on the record decimated by powers of two (zero phase FIR
+    anti-alias filter of scipy.signal.decimate, cutoff at 1/2 of the old Nyquist
+    frequency, i.e. at the new Nyquist frequency), short periods with less than
+    minPointsPerPeriod samples per cycle on the record linearly interpolated to a
+    finer step, which is the piecewise linear excitation the exact solution already
+    assumes.
+
+    Error bound: with pointsPerPeriod = 32 a band keeps at least 32 samples per period,
+    so the anti-alias cutoff is at or above 16 / T, where the absolute acceleration
+    transfer function of the oscillator is below sqrt(1 + (2 z r)^2) / (r^2 - 1) with
+    r = 16, i.e. about 0.75% of the removed content for z = 5%. Sampling the peak of a
+    cycle with 32 points misses at most 1 - cos(pi / 32), about 0.5%. Together the
+    decimated bands stay within roughly 1.3% of the full rate spectrum, while their
+    cost drops by the decimation factor.
+    """
+    T = np.array(T, dtype=float)
+    T[T == 0] = np.finfo(float).eps
+    s = np.asarray(s, dtype=float)
+    dampings = np.atleast_1d(np.asarray(dampings, dtype=float))
+    
+    spectra = {
+        'T': T,
+        'damping': dampings,
+    }
+    for quantity in ['SD', 'SV', 'PSV', 'PSA', 'SA']:
+        spectra[quantity] = np.zeros((dampings.size, T.size))
+    
+    # decimated records are built as a cascade of factor two stages
+    decimated = {1: s}
+    
+    for up, down, index in rateBands(T, dt, np.size(s), pointsPerPeriod, minPointsPerPeriod):
+        factor = 1
+        while factor < down:
+            if 2 * factor not in decimated:
+                decimated[2 * factor] = signal.decimate(decimated[factor], 2, ftype='fir', zero_phase=True)
+            factor *= 2
         
-        CoF3 = H3 * ffts
-        a = ifft(CoF3)
-        a = a - s
-        SA[kk] = np.max(np.abs(a))
+        record = decimated[down]
+        bandDt = dt * down
+        
+        if up > 1:
+            fineTime = np.arange((np.size(record) - 1) * up + 1) * (bandDt / up)
+            record = np.interp(fineTime, np.arange(np.size(record)) * bandDt, record)
+            bandDt = bandDt / up
+        
+        band = ResponseSpectra(T[index], record, dampings, bandDt)
+        for quantity in ['SD', 'SV', 'PSV', 'PSA', 'SA']:
+            spectra[quantity][:, index] = band[quantity]
     
-    return SA
+    return spectra
 
-def ariasIntensityCreator(filteredAcc, samplingInterval):
-    # calculate time array
-    ariasTime = samplingInterval * np.arange(0, len(filteredAcc))
+def RotDSpectrum(T, s1, s2, z, dt, angles=np.arange(180)):
+    """
+    Orientation independent pseudo-acceleration spectra of two orthogonal horizontal components.
+
+    The oscillator is linear, so the response to the record rotated by an angle is the same
+    rotation of the two component responses: two SDOF solutions per period are enough for
+    every angle.
+
+    Args:
+        T: periods
+        s1, s2: orthogonal acceleration records with the same sampling interval
+        z: damping ratio
+        dt: sampling interval
+        angles: rotation angles in degrees
+
+    Returns:
+        rotDDict (dict): 'T', 'angles', 'RotD' with shape (nperiod, nangle) and the
+            'RotD00', 'RotD50', 'RotD100' spectra with the 'azimuth' of RotD100
+    """
+    T = np.array(T, dtype=float)
+    T[T == 0] = np.finfo(float).eps
+    s1 = np.asarray(s1, dtype=float)
+    s2 = np.asarray(s2, dtype=float)
+    angles = np.asarray(angles, dtype=float)
+    
+    if s1.size != s2.size:
+        raise ValueError(f"Components must have the same number of points ({s1.size} != {s2.size})")
+    
+    theta = np.radians(angles)[:, np.newaxis]
+    cosine, sine = np.cos(theta), np.sin(theta)
+    
+    # relative displacement filters for all periods
+    wn, A, B = pwCoefficients(T, z, dt)
+    num, den, init = pwFilter(A, B, 1.0, 0.0)
+    
+    peaks = np.zeros((T.size, angles.size))
+    
+    for k in range(T.size):
+        u1 = pwHistory(num[k], den[k], init[k], s1)
+        u2 = pwHistory(num[k], den[k], init[k], s2)
+        radius = np.hypot(u1, u2)
+        
+        # the largest radii give a lower bound of every angle's peak, samples with a
+        # smaller radius can not hold a peak and are skipped
+        top = np.argpartition(radius, -64)[-64:] if radius.size > 64 else np.arange(radius.size)
+        bound = np.min(np.max(np.abs(cosine * u1[top] + sine * u2[top]), axis=1))
+        candidates = np.flatnonzero(radius >= bound)
+        
+        for start in range(0, candidates.size, 8192):
+            index = candidates[start:start + 8192]
+            rotated = np.max(np.abs(cosine * u1[index] + sine * u2[index]), axis=1)
+            peaks[k] = np.maximum(peaks[k], rotated)
+    
+    rotD = wn[:, np.newaxis] ** 2 * peaks
+    
+    rotDDict = {
+        'T': T,
+        'angles': angles,
+        'RotD': rotD,
+        'RotD00': np.min(rotD, axis=1),
+        'RotD50': np.median(rotD, axis=1),
+        'RotD100': np.max(rotD, axis=1),
+        'azimuth': angles[np.argmax(rotD, axis=1)]
+    }
+    
+    return rotDDict
 
-    # square the accelerations
-    accSquare = np.square(filteredAcc)
+def cumulativeIntegral(values, dt):
+    # cumulative trapezoid starting from zero
+    integral = np.empty(len(values))
+    integral[0] = 0.0
+    np.cumsum(0.5 * dt * (values[1:] + values[:-1]), out=integral[1:])
+
+    return integral
+
+class IntensityIndex:
+    """
+    Cumulative integrals of a record, windowed intensities and durations are answered with searchsorted.
+
+    Args:
+        acc (np.ndarray): acceleration
+        dt (float): sampling interval (s)
+        t0 (float): time of the first sample (s)
+    """
+
+    # init function
+    def __init__(self, acc, dt, t0=0.0):
+        self.acc = np.asarray(acc, dtype=float)
+        self.dt = dt
+        self.time = t0 + dt * np.arange(len(self.acc))
+
+        # arias (integral of a^2), cav (integral of |a|) and integral of v^2
+        self.velocity = cumulativeIntegral(self.acc, dt)
+        self.cumulative = {
+            'arias': cumulativeIntegral(np.square(self.acc), dt),
+            'cav': cumulativeIntegral(np.abs(self.acc), dt),
+            'velocity': cumulativeIntegral(np.square(self.velocity), dt),
+        }
+
+        # exceedance counts of the bracketed duration, one per threshold
+        self.exceedances = {}
+
+    def bounds(self, start=None, end=None):
+        # first and last sample inside the window
+        first = 0 if start is None else int(np.searchsorted(self.time, start, side='left'))
+        last = len(self.time) - 1 if end is None else int(np.searchsorted(self.time, end, side='right')) - 1
+
+        if last < first:
+            raise ValueError("Time window does not contain any samples.")
+
+        return first, last
+
+    def intensity(self, quantity='arias', start=None, end=None):
+        """
+        Integral of a^2 ('arias'), |a| ('cav') or v^2 ('velocity') between two times.
+        """
+        first, last = self.bounds(start, end)
+        cumulative = self.cumulative[quantity]
+
+        return cumulative[last] - cumulative[first]
+
+    def durationIndices(self, low=0.05, high=0.95, start=None, end=None):
+        # first sample above low and last sample below high fraction of the window intensity
+        first, last = self.bounds(start, end)
+        cumulative = self.cumulative['arias'][first:last + 1]
+        base = cumulative[0]
+        total = cumulative[-1] - base
+
+        lowIndex = int(np.searchsorted(cumulative, base + low * total, side='right'))
+        highIndex = int(np.searchsorted(cumulative, base + high * total, side='left')) - 1
+
+        return first + lowIndex, first + highIndex
+
+    def significantDuration(self, low=0.05, high=0.95, start=None, end=None):
+        """
+        Time between low and high fractions of the arias intensity, D5-95 by default.
+        """
+        lowIndex, highIndex = self.durationIndices(low, high, start, end)
+
+        if highIndex < lowIndex:
+            return 0.0
+
+        return self.time[highIndex] - self.time[lowIndex]
+
+    def bracketedDuration(self, threshold, start=None, end=None):
+        """
+        Time between the first and last exceedance of |a| >= threshold.
+        """
+        if threshold not in self.exceedances:
+            self.exceedances[threshold] = np.cumsum(np.abs(self.acc) >= threshold)
+        counts = self.exceedances[threshold]
+
+        first, last = self.bounds(start, end)
+        before = counts[first - 1] if first > 0 else 0
+
+        if counts[last] == before:
+            return 0.0
+
+        firstExceedance = int(np.searchsorted(counts, before + 1, side='left'))
+        lastExceedance = int(np.searchsorted(counts, counts[last], side='left'))
+
+        return self.time[lastExceedance] - self.time[firstExceedance]
+
+def ariasIntensityCreator(filteredAcc, samplingInterval, index=None):
+    # cumulative integrals, reused if the index of the record is given
+    if index is None:
+        index = IntensityIndex(filteredAcc, samplingInterval)
+
+    # calculate time array
+    ariasTime = index.time - index.time[0]
     
     # integrate to find arias intensity
-    ariasIntensity = samplingInterval * integrate.cumtrapz(accSquare, initial=0)
+    ariasIntensity = index.cumulative['arias']
     
     # calculate the 5% and 95% Arias Intensity
     arias05 = 0.05 * ariasIntensity[-1]
     arias95 = 0.95 * ariasIntensity[-1]
     
     # calculate the duration where arias intensity is between 5% and 95%
-    timeAriasList = [index for index, value in enumerate(ariasIntensity) if value > arias05 and value < arias95]
+    lowIndex, highIndex = index.durationIndices(0.05, 0.95)
+    timeAriasList = range(lowIndex, highIndex + 1)
     
     if timeAriasList:
         durationAriasIntensity = ariasTime[timeAriasList[-1]] - ariasTime[timeAriasList[0]]
@@ -177,9 +662,91 @@ def ariasIntensityCreator(filteredAcc, samplingInterval):
 
     return ariasDict
 
-def fourierTransform(data, delta, npts):
+def fourierTransform(data, delta, npts, pad=False, taper=0.0):
+    """
+    Fourier amplitude spectrum.
+
+    Args:
+        data (np.ndarray): acceleration
+        delta (float): sampling interval (s)
+        npts (int): number of points of the transform
+        pad (bool): zero pad to a fast fft length
+        taper (float): fraction of the record in the cosine tapers of a Tukey window, 0 for no taper
+    Returns:
+        tuple: frequencies (Hz) and amplitudes
+    """
+    data = np.asarray(data, dtype=float)
+    nfft = next_fast_len(npts, real=True) if pad else npts
+
+    if taper > 0:
+        data = data * signal.windows.tukey(len(data), taper)
+
+    amp = abs(rfft(data, nfft))
+    freq = rfftfreq(nfft, delta)
+
+    return freq, amp
+
+@lru_cache(maxsize=16)
+def smoothingMatrix(nfft, delta, bandwidth, nOut, kind='konno'):
+    """
+    Sparse smoothing operator from rfft bins to a log frequency grid, cached per record length.
+
+    Args:
+        nfft (int): length of the transform
+        delta (float): sampling interval (s)
+        bandwidth (float): konno-ohmachi b, the window spans +-pi/b decades
+        nOut (int): number of log spaced output frequencies
+        kind (str): 'konno' for konno-ohmachi weights, 'log' for equal weights in log frequency
+    Returns:
+        tuple: output frequencies (Hz) and scipy.sparse csr matrix (nOut, nfft//2 + 1)
+    """
+    freq = rfftfreq(nfft, delta)
+    centers = np.geomspace(freq[1], freq[-1], nOut)
+    halfWidth = np.pi / bandwidth
+
+    # only the bins of the main lobe carry weight
+    starts = np.searchsorted(freq, centers * 10**-halfWidth, side='left')
+    ends = np.searchsorted(freq, centers * 10**halfWidth, side='right')
+    starts = np.clip(starts, 1, len(freq) - 1)
+
+    # narrow windows at low frequencies keep at least the next bin
+    ends = np.maximum(ends, starts + 1)
+    counts = ends - starts
+    rows = np.repeat(np.arange(nOut), counts)
+    columns = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+
+    if kind == 'konno':
+        x = bandwidth * np.log10(freq[columns] / centers[rows])
+        weights = np.ones_like(x)
+        nonzero = x != 0
+        weights[nonzero] = (np.sin(x[nonzero]) / x[nonzero])**4
+    elif kind == 'log':
+        weights = np.ones(len(columns))
+    else:
+        raise ValueError("Smoothing must be 'konno' or 'log'.")
+
+    # every row sums to one
+    rowSums = np.bincount(rows, weights=weights, minlength=nOut)
+    weights = weights / rowSums[rows]
+
+    matrix = sparse.csr_matrix((weights, (rows, columns)), shape=(nOut, len(freq)))
+
+    return centers, matrix
+
+def smoothFourier(amp, nfft, delta, bandwidth=40, nOut=512, kind='konno'):
+    """
+    Smoothed fourier amplitudes on a log frequency grid, a sparse mat-vec with a cached operator.
 
-    amp = abs(rfft(data))                          
-    freq = linspace(0, int((1/delta)/2), int((npts/2)+1))
+    Args:
+        amp (np.ndarray): amplitudes of fourierTransform
+        nfft (int): length of the transform
+        delta (float): sampling interval (s)
+        bandwidth (float): konno-ohmachi b
+        nOut (int): number of output frequencies
+        kind (str): 'konno' or 'log'
+    Returns:
+        tuple: frequencies (Hz) and smoothed amplitudes
+    """
+    centers, matrix = smoothingMatrix(int(nfft), round(float(delta), 12), float(bandwidth), int(nOut), kind)
 
-    return freq, amp
\ No newline at end of file
+    return centers, matrix @ amp
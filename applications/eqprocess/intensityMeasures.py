@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from scipy.fft import rfft, rfftfreq
+from applications.eqprocess.eqProcessFunctions import IntensityIndex, ResponseSpectra, cumulativeIntegral, logPeriods
+
+# standard gravity (m/s^2)
+gravity = 9.80665
+
+# record units to m/s^2
+unitFactors = {
+    'g': gravity,
+    'cm/s^2': 0.01,
+    'm/s^2': 1.0,
+}
+
+# units of the reported measures
+measureUnits = {
+    'PGA': 'g',
+    'PGV': 'cm/s',
+    'PGD': 'cm',
+    'Arias Intensity': 'm/s',
+    'CAV': 'm/s',
+    'Housner Intensity': 'cm',
+    'Bracketed Duration': 's',
+    'D5-75': 's',
+    'D5-95': 's',
+    'Predominant Period': 's',
+    'Mean Period': 's',
+}
+
+# spectrum periods, housner intensity is integrated over 0.1-2.5 s
+spectrumPeriods = np.unique(np.concatenate([logPeriods(0.02, 5.0, 100), np.linspace(0.1, 2.5, 25)]))
+
+def intensityMeasures(acc, dt, unit='g', damping=0.05, bracketThreshold=0.05, index=None, responseSpectra=ResponseSpectra):
+    """
+    Ground motion intensity measures of a record, integrals, spectrum and FFT are computed once.
+
+    Args:
+        acc (np.ndarray): acceleration in unit
+        dt (float): sampling interval (s)
+        unit (str): 'g', 'cm/s^2' or 'm/s^2'
+        damping (float): damping ratio of the housner intensity and predominant period spectrum
+        bracketThreshold (float): acceleration threshold of the bracketed duration (g)
+        index (IntensityIndex): cumulative integrals of acc, reused if given
+        responseSpectra (callable): ResponseSpectra or a cached function with its signature
+    Returns:
+        dict: measure name to value, units are in measureUnits
+    """
+    if unit not in unitFactors:
+        raise ValueError(f"Unit must be one of {', '.join(unitFactors)}.")
+    factor = unitFactors[unit]
+
+    # integrals of the record in its own unit, scaled to si
+    if index is None:
+        index = IntensityIndex(acc, dt)
+    acc = index.acc
+    velocity = index.velocity * factor
+    displacement = cumulativeIntegral(velocity, dt)
+
+    # 5% damped spectrum for housner intensity and predominant period
+    spectra = responseSpectra(spectrumPeriods, acc * factor, [damping], dt)
+    housnerBand = (spectrumPeriods >= 0.1) & (spectrumPeriods <= 2.5)
+    housner = np.trapz(spectra['PSV'][0][housnerBand], spectrumPeriods[housnerBand])
+
+    # mean period from the fourier amplitudes between 0.25 and 20 Hz
+    amplitude = np.abs(rfft(acc))
+    frequency = rfftfreq(len(acc), dt)
+    fourierBand = (frequency >= 0.25) & (frequency <= 20)
+    power = np.square(amplitude[fourierBand])
+    meanPeriod = np.sum(power / frequency[fourierBand]) / np.sum(power) if np.sum(power) > 0 else np.nan
+
+    return {
+        'PGA': np.max(np.abs(acc)) * factor / gravity,
+        'PGV': np.max(np.abs(velocity)) * 100,
+        'PGD': np.max(np.abs(displacement)) * 100,
+        'Arias Intensity': np.pi / (2 * gravity) * index.intensity('arias') * factor**2,
+        'CAV': index.intensity('cav') * factor,
+        'Housner Intensity': housner * 100,
+        'Bracketed Duration': index.bracketedDuration(bracketThreshold * gravity / factor),
+        'D5-75': index.significantDuration(0.05, 0.75),
+        'D5-95': index.significantDuration(0.05, 0.95),
+        'Predominant Period': spectrumPeriods[np.argmax(spectra['PSA'][0])],
+        'Mean Period': meanPeriod,
+    }
+
+def intensityMeasureTable(records, damping=0.05, bracketThreshold=0.05):
+    """
+    Intensity measures of many records.
+
+    Args:
+        records (list): record dicts with acceleration, dt, unit and optionally filename
+        damping (float): damping ratio of the spectrum based measures
+        bracketThreshold (float): acceleration threshold of the bracketed duration (g)
+    Returns:
+        pd.DataFrame: one row per record, one column per measure
+    """
+    rows, names = [], []
+    for number, record in enumerate(records):
+        rows.append(intensityMeasures(record['acceleration'], record['dt'], record.get('unit', 'g'), damping, bracketThreshold))
+        names.append(record.get('filename', number))
+
+    return pd.DataFrame(rows, index=names, columns=list(measureUnits))
@@ -0,0 +1,133 @@
+import json
+import numpy as np
+import pandas as pd
+from applications.eqprocess.eqProcessFunctions import detrendFunction, filterArray
+from components.caches import LRUCache
+
+# stages are always applied in this order, a stage without parameters is skipped
+stageOrder = ('trim', 'detrend', 'filter')
+
+def emptyStages(recordId):
+    # stage parameters of a new record, kept in the browser
+    stages = {'recordId': recordId}
+    stages.update({stage: None for stage in stageOrder})
+
+    return stages
+
+def trimStage(time, acc, params):
+    start, end = params
+    mask = (time >= start) & (time <= end)
+
+    return time[mask], acc[mask]
+
+def detrendStage(time, acc, params):
+    accData = pd.DataFrame({'Time (s)': time, 'Acceleration': acc})
+    detrended = detrendFunction(accData, method=params['method'].lower(), order=params.get('order'))
+
+    return time, detrended['Detrended Acceleration'].values
+
+def filterStage(time, acc, params):
+    delta = time[1] - time[0]
+
+    # the stage input is cached, so the filter runs in place on a copy
+    filtered = filterArray(np.array(acc, dtype=float), params['type'], params['cutoff'], delta, params['order'],
+                           padtype=params.get('padtype', 'odd'), taper=params.get('taper', 0.0))
+
+    return time, filtered
+
+stageFunctions = {
+    'trim': trimStage,
+    'detrend': detrendStage,
+    'filter': filterStage,
+}
+
+class Pipeline:
+    """
+    Trim, detrend and filter stages of a record, the output of every stage is cached.
+
+    The key of a stage output is the record id and the parameters of that stage and
+    all stages before it, so changing one parameter re-runs only the stages after it.
+
+    Args:
+        maxItems (int): number of stage outputs kept in memory, least recently used are evicted first
+    """
+
+    # init function
+    def __init__(self, maxItems=64):
+        self.outputs = LRUCache(maxItems, counters=('runs',))
+
+    def get(self, key):
+        return self.outputs.get(key, countMiss=False)
+
+    def put(self, key, output, inputs=()):
+        # outputs are shared by the stages after them, so they are made read-only, arrays a
+        # stage passed through belong to the stage before it or to the record store and are left alone
+        for array in output:
+            if not any(np.may_share_memory(array, source) for source in inputs):
+                array.flags.writeable = False
+
+        self.remember(key, output)
+
+    def remember(self, key, output):
+        self.outputs.count('runs')
+        self.outputs.put(key, output)
+
+    def run(self, record, stages):
+        """
+        Applies the stages to a record.
+
+        Args:
+            record (dict): record of the record store
+            stages (dict): record id and the parameters of every stage, None to skip a stage
+        Returns:
+            dict: time, acceleration and dt of the processed signal
+        """
+        time, acc = record['time'], record['acceleration']
+        prefix = [stages['recordId']]
+
+        for stage in stageOrder:
+            params = stages.get(stage)
+            prefix.append(params)
+
+            if params is None:
+                continue
+
+            key = json.dumps(prefix, sort_keys=True)
+            output = self.get(key)
+
+            if output is None:
+                output = tuple(np.ascontiguousarray(array) for array in stageFunctions[stage](time, acc, params))
+                self.put(key, output, inputs=(time, acc))
+
+            time, acc = output
+
+        return {'time': time, 'acceleration': acc, 'dt': record['dt']}
+
+    def derived(self, record, stages, name, function):
+        """
+        Result of function on the pipeline output, cached with the stage outputs.
+
+        Args:
+            record (dict): record of the record store
+            stages (dict): record id and the parameters of every stage
+            name (str): name of the result, e.g. 'intensityIndex'
+            function (callable): takes the output of run
+        """
+        key = json.dumps([name, stages['recordId']] + [stages.get(stage) for stage in stageOrder], sort_keys=True)
+        result = self.get(key)
+
+        if result is None:
+            result = function(self.run(record, stages))
+            self.remember(key, result)
+
+        return result
+
+    def stats(self):
+        # a miss is always followed by a run, so only the runs are reported
+        stats = self.outputs.stats()
+        stats.pop('misses')
+
+        return stats
+
+# shared pipeline of the processor page
+pipeline = Pipeline()
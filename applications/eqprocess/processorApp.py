@@ -1,26 +1,36 @@
 import dash_mantine_components as dmc
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Output, Input, State, callback, ctx, dash_table
+from dash import html, dcc, Output, Input, State, callback, clientside_callback, ClientsideFunction, ctx, dash_table, Patch, no_update
 from dash.exceptions import PreventUpdate
 from dash_iconify import DashIconify
 import plotly.graph_objects as go
+from scipy.fft import next_fast_len
 import pandas as pd
-from applications.eqprocess.eqProcessFunctions import detrendFunction, filterFunction, ResponseSpectrum, ariasIntensityCreator, fourierTransform
-from applications.eqprocess.record import AT2, ASC
+import numpy as np
+from applications.eqprocess.eqProcessFunctions import ariasIntensityCreator, fourierTransform, smoothFourier, periodGrid, IntensityIndex, butterworthSOS
+from applications.eqprocess.pipeline import pipeline, emptyStages
+from applications.eqprocess.intensityMeasures import intensityMeasures, measureUnits
+from applications.eqprocess.timeFrequency import spectrogramImage, welchPSD
+from applications.eqprocess.recordStore import recordStore
+from applications.eqprocess.spectrumCache import cachedResponseSpectra
 from components.navbar import navbar
+from components.jobs import heavyJob
+from components.figures import visibleWindow, relayoutRange, figureTrace, heatmapTrace, typedArray
 from io import BytesIO
 import base64
+import json
 
 processorTitle = dmc.Text("🌐 Earthquake Data Processor", className='fs-3 mx-4 mb-3 mt-3 text-center')
 
-# set the data import area
-dataImporter = dcc.Upload(
+# set the data import area, files are sent in chunks by assets/upload.js
+dataImporter = html.Div(
     id='uploadData',
     children=html.Div([
     dmc.Button(
         html.Div([
                 html.Div("Upload or Drag and Drop File", className="mt-2 mx-2", style={'fontSize': '16px'}),
                 html.Div("Limit 200MB per file • AT2, ASC", className="mt-2 mb-2 mx-2", style={'fontSize': '10px'}),
+                html.Div(id='uploadProgress', className="mb-2 mx-2", style={'fontSize': '10px'}),
             ]),
         leftIcon=DashIconify(icon="clarity:upload-cloud-line", width=30),
         variant="link",
@@ -55,6 +65,7 @@ trimTab = dbc.Card(
                 showLabelOnHover=True,
                 className="mt-2 mb-4"
             ),
+            html.Div(id="trimPreview", className="mb-2 mx-1", style={'fontSize': '12px'}),
             dbc.Button("Apply Trim", id="applyTrim", color="primary", className="mt-2"),
             dbc.Button("Reset", id="resetTrim", color="info", outline=True, className="mt-2 mx-2", style={'display': 'none'}),
         ]
@@ -95,6 +106,16 @@ filterTab = dbc.Card(
             ], className="mb-1"),
             dbc.Label("Order", id="filterOrderLabel", className="mb-2 mt-1 mx-1"),
             dbc.Input(type="number", id='filterOrderInput', value=4, className="mb-2 mt-1"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Padding", className="mb-2 mt-1 mx-1"),
+                    dcc.Dropdown(id='filterPadInput', options=['Odd', 'Even', 'Constant', 'None'], value='Odd', clearable=False, className="mb-2 mt-1 text-black"),
+                ], xs=12, sm=12, md=6),
+                dbc.Col([
+                    dbc.Label("Taper (%)", className="mb-2 mt-1 mx-1"),
+                    dbc.Input(type="number", id='filterTaperInput', value=0, min=0, max=100, className="mb-2 mt-1"),
+                ], xs=12, sm=12, md=6),
+            ], className="mb-1"),
             dbc.Button("Apply Filter", id="applyFilter", color="primary", className="mt-2"),
         ]
     ),
@@ -159,7 +180,7 @@ defaultResponseFig.update_layout(
 )
 defaultResponseFig.update_xaxes(
     rangemode='tozero',
-    title_text='Time (s)'
+    title_text='Period (s)'
 )
 defaultResponseFig.update_yaxes(
     rangemode='tozero',
@@ -173,9 +194,35 @@ responseArea = html.Div(
             dbc.Card(
                 html.Div(
                     children=[
-                        dbc.Label("Damping Ratio (%)", id="dampingLabel", className="mb-2 mt-1 mx-1"),
-                        dbc.Input(type="number", id='dampingRatioInput', value=5, className="mb-2 mt-1"),
+                        dbc.Label("Damping Ratios (%)", id="dampingLabel", className="mb-2 mt-1 mx-1"),
+                        dbc.Input(type="text", id='dampingRatioInput', value="5", placeholder="2, 5, 10", className="mb-2 mt-1"),
+                        dbc.Label("Spectral Quantity", className="mb-2 mt-1 mx-1"),
+                        dcc.Dropdown(id='responseQuantityInput', options=['SA', 'PSA', 'PSV', 'SV', 'SD'], value='SA', clearable=False, className="mb-2 mt-1 text-black"),
+                        dbc.Label("Period Grid", className="mb-2 mt-1 mx-1"),
+                        dcc.Dropdown(id='periodGridInput', options=['Logarithmic', 'NGA-West2', 'User-Defined'], value='Logarithmic', clearable=False, className="mb-2 mt-1 text-black"),
+                        html.Div([
+                            dbc.Row([
+                                dbc.Col([
+                                    dbc.Label("Min (s)", className="mb-2 mt-1 mx-1"),
+                                    dbc.Input(type="number", id='minPeriodInput', value=0.01, className="mb-2 mt-1"),
+                                ], xs=4),
+                                dbc.Col([
+                                    dbc.Label("Max (s)", className="mb-2 mt-1 mx-1"),
+                                    dbc.Input(type="number", id='maxPeriodInput', value=10.0, className="mb-2 mt-1"),
+                                ], xs=4),
+                                dbc.Col([
+                                    dbc.Label("Count", className="mb-2 mt-1 mx-1"),
+                                    dbc.Input(type="number", id='numberPeriodsInput', value=100, className="mb-2 mt-1"),
+                                ], xs=4),
+                            ]),
+                        ], id='logGridArea', style={'display': 'block'}),
+                        html.Div([
+                            dbc.Label("Periods (s)", className="mb-2 mt-1 mx-1"),
+                            dbc.Input(type="text", id='userPeriodsInput', placeholder="0.1, 0.2, 0.5, 1.0", className="mb-2 mt-1"),
+                        ], id='userGridArea', style={'display': 'none'}),
+                        dbc.Checkbox(id='multiRateInput', label="Multi-rate (faster long periods)", value=False, className="mb-2 mt-2 mx-1"),
                         dbc.Button("Create Response Spectrum", id="createResponse", color="primary", className="mt-2 w-100"),
+                        html.Div(id='responseProgress', className="mt-2 mx-1", style={'display': 'none'}),
                     ], className="inputArea mx-2 mb-2 mt-1"),
                 className="inputForm mx-2 mt-5 mb-4"),
             dbc.Button("Export Response to Excel", id="exportResponseButton", color="info", outline=True, className="mt-1 mx-2"),
@@ -252,6 +299,19 @@ fourierArea = html.Div(
             dbc.Card(
                 html.Div(
                     children=[
+                        dbc.Label("Smoothing", className="mb-2 mt-1 mx-1"),
+                        dcc.Dropdown(id='fourierSmoothingInput', options=['None', 'Konno-Ohmachi', 'Log Window'], value='Konno-Ohmachi', clearable=False, className="mb-2 mt-1 text-black"),
+                        dbc.Row([
+                            dbc.Col([
+                                dbc.Label("Bandwidth (b)", className="mb-2 mt-1 mx-1"),
+                                dbc.Input(type="number", id='fourierBandwidthInput', value=40, min=1, className="mb-2 mt-1"),
+                            ], xs=6),
+                            dbc.Col([
+                                dbc.Label("Taper (%)", className="mb-2 mt-1 mx-1"),
+                                dbc.Input(type="number", id='fourierTaperInput', value=5, min=0, max=100, className="mb-2 mt-1"),
+                            ], xs=6),
+                        ]),
+                        dbc.Checkbox(id='fourierPadInput', label="Zero pad to a fast length", value=True, className="mb-2 mt-2 mx-1"),
                         dbc.Button("Create Fourier Transform", id="createFourier", color="primary", className="mt-2 w-100"),
                     ], className="inputArea mx-2 mb-2 mt-1"),
                 className="inputForm mx-2 mt-5 mb-4"),
@@ -265,6 +325,88 @@ fourierArea = html.Div(
     ], className="")
 )
 
+# Time-Frequency figures
+defaultSpectrogramFig = go.Figure()
+defaultSpectrogramFig.update_layout(
+    title='Spectrogram', title_x=0.5,
+    template="plotly_white",
+    paper_bgcolor="white",
+    plot_bgcolor="white",
+)
+defaultSpectrogramFig.update_xaxes(
+    title_text='Time (s)'
+)
+defaultSpectrogramFig.update_yaxes(
+    title_text='Frequency (Hz)'
+)
+
+defaultPSDFig = go.Figure()
+defaultPSDFig.update_layout(
+    title='Welch Power Spectral Density', title_x=0.5,
+    template="plotly_white",
+    paper_bgcolor="white",
+    plot_bgcolor="white",
+    xaxis_type='log',
+    yaxis_type='log'
+)
+defaultPSDFig.update_xaxes(
+    title_text='Frequency (Hz)'
+)
+defaultPSDFig.update_yaxes(
+    title_text='PSD'
+)
+
+# Time-Frequency area
+timeFrequencyArea = html.Div(
+    dbc.Row([
+        dbc.Col([
+            dbc.Card(
+                html.Div(
+                    children=[
+                        dbc.Label("Window (samples)", className="mb-2 mt-1 mx-1"),
+                        dbc.Input(type="number", id='stftWindowInput', value=256, min=8, step=1, className="mb-2 mt-1"),
+                        dbc.Label("Overlap (%)", className="mb-2 mt-1 mx-1"),
+                        dbc.Input(type="number", id='stftOverlapInput', value=75, min=0, max=95, className="mb-2 mt-1"),
+                        dbc.Label("Welch Window (samples)", className="mb-2 mt-1 mx-1"),
+                        dbc.Input(type="number", id='welchWindowInput', value=1024, min=8, step=1, className="mb-2 mt-1"),
+                        dbc.Button("Create Spectrogram", id="createSpectrogram", color="primary", className="mt-2 w-100"),
+                    ], className="inputArea mx-2 mb-2 mt-1"),
+                className="inputForm mx-2 mt-5 mb-4"),
+        ], xs=12, sm=12, md=3),
+        
+        dbc.Col([
+            dbc.Row([
+                html.Div(dcc.Graph(figure=defaultSpectrogramFig, id="defaultSpectrogramFig"))
+            ]),
+            dbc.Row([
+                html.Div(dcc.Graph(figure=defaultPSDFig, id="defaultPSDFig"))
+            ]),
+        ], xs=12, sm=12, md=9)
+    ], className="")
+)
+
+# Intensity Measures area
+intensityArea = html.Div(
+    dbc.Row([
+        dbc.Col([
+            dbc.Card(
+                html.Div(
+                    children=[
+                        dbc.Label("Bracketed Duration Threshold (g)", className="mb-2 mt-1 mx-1"),
+                        dbc.Input(type="number", id='bracketThresholdInput', value=0.05, min=0, step=0.01, className="mb-2 mt-1"),
+                        dbc.Button("Compute Intensity Measures", id="createIntensity", color="primary", className="mt-2 w-100"),
+                    ], className="inputArea mx-2 mb-2 mt-1"),
+                className="inputForm mx-2 mt-5 mb-4")
+        ], xs=12, sm=12, md=3),
+        
+        dbc.Col([
+            dbc.Row([
+                html.Div(id="intensityTable", className="mt-5")
+            ]),
+        ], xs=12, sm=12, md=9)
+    ], className="")
+)
+
 # Metadata area
 metaDict = {
     'col_1': ['Location', 'Date'],
@@ -305,7 +447,7 @@ metadataArea = html.Div(
 )
 
 # Analysis area
-data = [["response", "Response Spectrum"], ["arias", "Arias Intensity"], ["fourier", "Fourier Transform"], ["meta", "Metadata"]]
+data = [["response", "Response Spectrum"], ["arias", "Arias Intensity"], ["fourier", "Fourier Transform"], ["timefrequency", "Time-Frequency"], ["intensity", "Intensity Measures"], ["meta", "Metadata"]]
 analysisArea = html.Div(
     [
         dmc.Tabs(
@@ -315,12 +457,16 @@ analysisArea = html.Div(
                         dmc.Tab("Response Spectrum", value="response"),
                         dmc.Tab("Arias Intensity", value="arias"),
                         dmc.Tab("Fourier Transform", value="fourier"),
+                        dmc.Tab("Time-Frequency", value="timefrequency"),
+                        dmc.Tab("Intensity Measures", value="intensity"),
                         dmc.Tab("Metadata", value="meta"),
                     ], grow=True
                 ),
                 dmc.TabsPanel(responseArea, value="response"),
                 dmc.TabsPanel(ariasArea, value="arias"),
                 dmc.TabsPanel(fourierArea, value="fourier"),
+                dmc.TabsPanel(timeFrequencyArea, value="timefrequency"),
+                dmc.TabsPanel(intensityArea, value="intensity"),
                 dmc.TabsPanel(metadataArea, value="meta")
             ],
             value="response",
@@ -356,6 +502,9 @@ def layout():
         processorTitle,
         operationsArea,
         dcc.Store(id='uploadedDataStore'),
+        dcc.Store(id='uploadHandleStore'),
+        dcc.Store(id='pipelineStore'),
+        dcc.Store(id='responseStore'),
         dcc.Download(id="downloadAcceleration"),
         dcc.Download(id="downloadResponse"),
     ])
@@ -364,68 +513,154 @@ def layout():
 @callback(
     Output('outputFileName', 'children'),
     Output('uploadedDataStore', 'data'),
-    Input('uploadData', 'contents'),
-    Input('uploadData', 'filename'),
+    Input('uploadHandleStore', 'data'),
 )
-def filenameOutput(contents, filename):
-    if contents is None:
+def filenameOutput(handle):
+    if handle is None:
         return html.Div(), None
     
-    if any(filename.endswith(ext) for ext in ['asc', 'AT2']):
+    # the upload route reports format and parsing errors
+    if 'error' in handle:
         return html.Div([
-            dbc.Alert(f"✅ File successfully uploaded: {filename}", color="light", className="mt-4")
-        ]), contents
-    else:
+            dbc.Alert(f"❗{handle['error']}", color="danger", className="mt-4")
+        ]), None
+    
+    # only the record id goes to the browser, the record stays on the server
+    if recordStore.get(handle['recordId']) is None:
         return html.Div([
-            dbc.Alert("❗File format is not supported. Supported formats: AT2, ASC", color="danger", className="mt-4")
-        ]), contents
+            dbc.Alert("❗File could not be found, please upload it again.", color="danger", className="mt-4")
+        ]), None
+    
+    return html.Div([
+        dbc.Alert(f"✅ File successfully uploaded: {handle['filename']}", color="light", className="mt-4")
+    ]), {'recordId': handle['recordId'], 'filename': handle['filename']}
 
-# visualize the uploaded data
+# tell the user when the record of the page is gone, the actions that need it are not run
 @callback(
-    Output('signalFig', 'figure'),
+    Output('outputFileName', 'children', allow_duplicate=True),
+    Output('uploadedDataStore', 'data', allow_duplicate=True),
+    Input('pipelineStore', 'data'),
+    Input('createResponse', 'n_clicks'),
+    Input('createArias', 'n_clicks'),
+    Input('createFourier', 'n_clicks'),
+    Input('createSpectrogram', 'n_clicks'),
+    Input('createIntensity', 'n_clicks'),
+    Input('getMetadata', 'n_clicks'),
+    Input('exportAccButton', 'n_clicks'),
+    Input('exportResponseButton', 'n_clicks'),
+    State('uploadedDataStore', 'data'),
+    prevent_initial_call=True,
+)
+def recordExpired(stages, *args):
+    recordData = args[-1]
+    
+    if recordData is None or recordStore.get(recordData['recordId']) is not None:
+        return no_update, no_update
+    
+    return html.Div([
+        dbc.Alert(f"❗The record of {recordData['filename']} has expired, please upload the file again.", color="warning", className="mt-4")
+    ]), None
+
+# get the parsed record of the uploaded file
+def getRecord(recordData):
+    if recordData is None:
+        raise PreventUpdate
+    
+    record = recordStore.get(recordData['recordId'])
+    
+    # record is expired or evicted, recordExpired asks for the file again
+    if record is None:
+        raise PreventUpdate
+    
+    return record
+
+# get the processed signal of the uploaded file
+def getSignal(stages):
+    if stages is None:
+        raise PreventUpdate
+    
+    record = getRecord(stages)
+    
+    return pipeline.run(record, stages)
+
+# cumulative intensity index of the processed signal
+def getIntensityIndex(stages):
+    if stages is None:
+        raise PreventUpdate
+    
+    record = getRecord(stages)
+    
+    return pipeline.derived(record, stages, 'intensityIndex', lambda processed: IntensityIndex(processed['acceleration'], processed['dt'], processed['time'][0]))
+
+# percentage input as a fraction, empty as 0 and clamped to [0, upper] percent
+def percentFraction(value, upper=100):
+    return min(max(float(value or 0), 0), upper) / 100
+
+# start a new pipeline for the uploaded data
+@callback(
+    Output('pipelineStore', 'data'),
     Input('uploadedDataStore', 'data'),
-    Input('uploadData', 'filename'),
-    State('signalFig', 'figure'),
 )
-def visualizeData(contents, filename, fig):
-    if contents is None:
-        return fig
+def resetPipeline(recordData):
+    if recordData is None:
+        return None
+    
+    return emptyStages(recordData['recordId'])
+
+# visualize the processed data
+@callback(
+    Output('signalFig', 'figure'),
+    Input('pipelineStore', 'data'),
+)
+def visualizeData(stages):
+    if stages is None:
+        raise PreventUpdate
+    
+    record = getRecord(stages)
+    processed = pipeline.run(record, stages)
+    
+    # only the trace and axis titles are sent, the figure does not come back as state
+    fig = Patch()
     
     # clean fig
     fig['data'] = []
     
-    # visualize at2 data
-    if filename.endswith('AT2'):
-        at2Object = AT2(contents)
-        at2Frame = at2Object.accdata()
-        at2Trace = go.Scatter(
-                x = at2Frame['Time (s)'],
-                y = at2Frame['Acceleration (g)'],
-                line=dict(color="blue")
-            )
-        fig['data'].append(at2Trace)
-        fig['layout'].update(
-            xaxis=dict(title='Time (s)'),
-            yaxis=dict(title='Acceleration (g)')
-        )
-    
-    # visualize asc data
-    elif filename.endswith('asc'):
-        ascObject = ASC(contents)
-        ascFrame = ascObject.accdata()
-        ascTrace = go.Scatter(
-            x = ascFrame['Time (s)'],
-            y = ascFrame['Acceleration (cm/s^2)'],
-            line=dict(color="blue")
-        )
-        fig['data'].append(ascTrace)
-        fig['layout'].update(
-            xaxis=dict(title='Time (s)'),
-            yaxis=dict(title='Acceleration (cm/s^2)')
-        )
+    # visualize the record, min/max downsampled so the peaks are kept
+    time, acc = visibleWindow(processed['time'], processed['acceleration'])
+    recordTrace = figureTrace(
+        x = time,
+        y = acc,
+        line=dict(color="blue")
+    )
+    fig['data'].append(recordTrace)
+    fig['layout']['xaxis']['title'] = {'text': 'Time (s)'}
+    fig['layout']['yaxis']['title'] = {'text': f"Acceleration ({record['unit']})"}
+    fig['layout']['uirevision'] = json.dumps(stages, sort_keys=True)
         
     return fig
 
+# full resolution of the visible window on zoom
+@callback(
+    Output('signalFig', 'figure', allow_duplicate=True),
+    Input('signalFig', 'relayoutData'),
+    State('pipelineStore', 'data'),
+    prevent_initial_call=True
+)
+def zoomSignal(relayoutData, stages):
+    xRange = relayoutRange(relayoutData)
+    if xRange is False or stages is None:
+        raise PreventUpdate
+    
+    processed = getSignal(stages)
+    time, acc = visibleWindow(processed['time'], processed['acceleration'], xRange)
+    
+    # only the trace data is replaced, the zoom is kept by uirevision
+    patchedFig = Patch()
+    patchedFig['data'][0]['x'] = typedArray(time)
+    patchedFig['data'][0]['y'] = typedArray(acc)
+    
+    return patchedFig
+
 # update trim input
 @callback(
     [
@@ -437,276 +672,298 @@ def visualizeData(contents, filename, fig):
     
     [
         Input('uploadedDataStore', 'data'),
-        Input('uploadData', 'filename')
     ]
 )
-def updateInput(contents, filename):
-    if contents is None:
+def updateInput(recordData):
+    record = getRecord(recordData)
+    
+    timeMin = float(record['time'][0])
+    timeMax = float(record['time'][-1])
+    
+    return timeMin, timeMax, [timeMin, timeMax], [{"value": timeMin, "label": str(timeMin)}, {"value": timeMax, "label": str(timeMax)}]
+
+# stages are only stored once the pipeline runs them, a stage that fails would break every callback after it,
+# the output is cached so the figures reuse it
+def checkedStages(stages):
+    try:
+        pipeline.run(getRecord(stages), stages)
+    except (ValueError, TypeError, np.linalg.LinAlgError):
         raise PreventUpdate
-        
-    # get at2 data
-    if filename.endswith('AT2'):
-        at2Object = AT2(contents)
-        at2Frame = at2Object.accdata()
-        timeMin = at2Frame['Time (s)'].to_list()[0]
-        timeMax = at2Frame['Time (s)'].to_list()[-1]
-        
-        return timeMin, timeMax, [timeMin, timeMax], [{"value": timeMin, "label": str(timeMin)}, {"value": timeMax, "label": str(timeMax)}]
-        
-    # get asc data
-    elif filename.endswith('asc'):
-        ascObject = ASC(contents)
-        ascFrame = ascObject.accdata()
-        timeMin = ascFrame['Time (s)'].to_list()[0]
-        timeMax = ascFrame['Time (s)'].to_list()[-1]
-        
-        return timeMin, timeMax, [timeMin, timeMax], [{"value": timeMin, "label": str(timeMin)}, {"value": timeMax, "label": str(timeMax)}]
+    
+    return stages
 
 # apply trim
 @callback(
-    Output('signalFig', 'figure', allow_duplicate=True),
+    Output('pipelineStore', 'data', allow_duplicate=True),
     [
         State('trimRangeInput', 'value'),
-        State('signalFig', 'figure'),
-        State('uploadedDataStore', 'data'),
-        State('uploadData', 'filename'),        
+        State('pipelineStore', 'data'),
     ],
     Input('applyTrim', 'n_clicks'),
     Input('resetTrim', 'n_clicks'),
     prevent_initial_call=True
 )
-def applyTrim(trimRange, fig, contents, filename, clickApply, clickReset):
-    if not clickApply and not clickReset:
+def applyTrim(trimRange, stages, clickApply, clickReset):
+    if (not clickApply and not clickReset) or stages is None:
         raise PreventUpdate
     
     # Determine which button was clicked
     triggered_id = ctx.triggered_id
     
-     # line color
-    lineColor = 'blue'
-
-    # get at2 data
-    if filename.endswith('AT2'):
-        at2Object = AT2(contents)
-        at2Frame = at2Object.accdata()
-        originalData = pd.DataFrame({'x': at2Frame['Time (s)'].to_list(), 'y': at2Frame['Acceleration (g)'].to_list()})
-        
-    # get asc data
-    elif filename.endswith('asc'):
-        ascObject = ASC(contents)
-        ascFrame = ascObject.accdata()
-        originalData = pd.DataFrame({'x': ascFrame['Time (s)'].to_list(), 'y': ascFrame['Acceleration (cm/s^2)'].to_list()})
-        
-
+    # only the trim stage changes, detrend and filter are applied again on the new range
     if triggered_id == 'applyTrim':
+        try:
+            start, end = float(trimRange[0]), float(trimRange[1])
+        except (TypeError, ValueError, IndexError):
+            raise PreventUpdate
         
-        # trim the data
-        trimmedData = originalData[(originalData['x'] >= trimRange[0]) & (originalData['x'] <= trimRange[1])]
-        trimmedScatter = go.Scatter(
-            x=trimmedData['x'],
-            y=trimmedData['y'],
-            line=dict(color=lineColor)
-        )
-        
-        # clean the fig
-        fig['data'] = []
+        # at least two samples, the stages after the trim need a sampling interval
+        time = getRecord(stages)['time']
+        if np.count_nonzero((time >= start) & (time <= end)) < 2:
+            raise PreventUpdate
         
-        # add the new data
-        fig['data'].append(trimmedScatter)
+        return checkedStages(dict(stages, trim=[start, end]))
     
     elif triggered_id == 'resetTrim':
-        originalScatter = go.Scatter(
-            x=originalData['x'],
-            y=originalData['y'],
-            line=dict(color=lineColor)
-        )
-        
-        # clean the fig
-        fig['data'] = []
-        
-        # add the original data back
-        fig['data'].append(originalScatter)
+        return checkedStages(dict(stages, trim=None))
     
-    return fig
+    raise PreventUpdate
 
-# input detrend update
+# intensity of the selected trim range
 @callback(
+    Output('trimPreview', 'children'),
+    Input('trimRangeInput', 'value'),
+    State('pipelineStore', 'data'),
+)
+def trimPreview(trimRange, stages):
+    if stages is None or trimRange is None:
+        raise PreventUpdate
+    
+    # index of the untrimmed signal, every window is answered from its cumulative integrals
+    index = getIntensityIndex(dict(stages, trim=None))
+    
+    total = index.intensity('arias')
+    try:
+        ratio = index.intensity('arias', trimRange[0], trimRange[1]) / total if total > 0 else 0.0
+        duration = index.significantDuration(0.05, 0.95, trimRange[0], trimRange[1])
+    except ValueError:
+        return ""
+    
+    return f"Arias intensity kept: {ratio*100:.1f}% • D5-95 of the range: {duration:.2f} sec"
+
+# input detrend update, runs in the browser (assets/clientside.js)
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='showOrder'),
     Output('orderInput', 'style'),
     Output('orderLabel', 'style'),
     Input('detrendInput', 'value')
 )
-def showOrder(detrendMethod):
-    if detrendMethod == 'Linear':
-        return {'display': 'none'}, {'display': 'none'}
 
-    elif detrendMethod == 'Polynomial':
-        return {'display': 'block'}, {'display': 'block'}
-    
 # detrend function
 @callback(
-    Output('signalFig', 'figure', allow_duplicate=True),
+    Output('pipelineStore', 'data', allow_duplicate=True),
     State('detrendInput', 'value'),
     State('orderInput', 'value'),
-    State('signalFig', 'figure'),
+    State('pipelineStore', 'data'),
     Input('applyDetrend', 'n_clicks'),
     prevent_initial_call=True
 )
-def applyDetrend(method, order, fig, n_clicks):
-    if not n_clicks:
+def applyDetrend(method, order, stages, n_clicks):
+    if not n_clicks or stages is None:
         raise PreventUpdate
     
-    # line color
-    lineColor = 'blue'
-
-    # get current data
-    current_data = pd.DataFrame({'Time (s)': fig['data'][0]['x'], 'Acceleration': fig['data'][0]['y']})
-
-    # Apply detrending
-    detrended_data = detrendFunction(current_data, method=method.lower(), order=order)
-
-    detrended_scatter = go.Scatter(
-        x=detrended_data['Time (s)'],
-        y=detrended_data['Detrended Acceleration'],
-        line=dict(color=lineColor)
-    )
-
-    # Update the figure
-    fig['data'] = []
-    fig['data'].append(detrended_scatter)
-
-    return fig
+    # polynomial degree, a whole number
+    if method == 'Polynomial':
+        try:
+            degree = int(order)
+        except (TypeError, ValueError):
+            raise PreventUpdate
+        if degree < 0 or degree != order:
+            raise PreventUpdate
+        order = degree
+    elif method != 'Linear':
+        raise PreventUpdate
+    
+    # set the detrend stage
+    return checkedStages(dict(stages, detrend={'method': method, 'order': order}))
 
-# filter input area update
-@callback(
+# filter input area update, runs in the browser
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='filterInputArea'),
     Output('lowPassLabel', 'style'),
     Output('lowPassInput', 'style'),
     Output('highPassLabel', 'style'),
     Output('highPassInput', 'style'),
     Input('filterMethodInput', 'value')
 )
-def updateInputArea(method):
-    if method == 'Band-Pass':
-        return {'display': 'block'}, {'display': 'block'}, {'display': 'block'}, {'display': 'block'}
-    elif method == 'High-Pass':
-        return {'display': 'none'}, {'display': 'none'}, {'display': 'block'}, {'display': 'block'}
-    elif method == 'Low-Pass':
-        return {'display': 'block'}, {'display': 'block'}, {'display': 'none'}, {'display': 'none'}
-    
+
 # apply filter
 @callback(
-    Output('signalFig', 'figure', allow_duplicate=True),
+    Output('pipelineStore', 'data', allow_duplicate=True),
     Input('applyFilter', 'n_clicks'),
     State('filterMethodInput', 'value'),
     State('lowPassInput', 'value'),
     State('highPassInput', 'value'),
     State('filterOrderInput', 'value'),
-    State('signalFig', 'figure'),
+    State('filterPadInput', 'value'),
+    State('filterTaperInput', 'value'),
+    State('pipelineStore', 'data'),
     prevent_initial_call = True
 )
-def applyFilter(click, filterMethod, lowpasscorner, highpasscorner, filterOrder, fig):
+def applyFilter(click, filterMethod, lowpasscorner, highpasscorner, filterOrder, padding, taper, stages):
     
-    if click is None:
+    if click is None or stages is None:
         raise PreventUpdate
     
-    # line color
-    lineColor = 'blue'
-
-    # get the data
-    current_data = pd.DataFrame({'x': fig['data'][0]['x'], 'y': fig['data'][0]['y']})
-    
-    # get the delta
-    delta = current_data['x'][1] - current_data['x'][0]
-    
-    # filter the data
+    # set the filter stage
     if filterMethod == 'Band-Pass':
-        filteredData = filterFunction(current_data, 'bandpass', [lowpasscorner, highpasscorner], delta, filterOrder)
+        filterType, cutoff = 'bandpass', [lowpasscorner, highpasscorner]
     elif filterMethod == 'Low-Pass':
-        filteredData = filterFunction(current_data, 'lowpass', [lowpasscorner], delta, filterOrder)
+        filterType, cutoff = 'lowpass', [lowpasscorner]
     elif filterMethod == 'High-Pass':
-        filteredData = filterFunction(current_data, 'highpass', [highpasscorner], delta, filterOrder)        
+        filterType, cutoff = 'highpass', [highpasscorner]
+    else:
+        raise PreventUpdate
     
-    # create scatter
-    filteredScatter = go.Scatter(
-        x = filteredData['x'],
-        y = filteredData['y'],
-        line=dict(color=lineColor)
-    )
+    # corners below the Nyquist frequency of the record and a whole positive order, checked by designing the filter
+    try:
+        cutoff = [float(corner) for corner in cutoff]
+        filterOrder = int(filterOrder)
+        if filterOrder < 1:
+            raise ValueError("Filter order must be positive.")
+        butterworthSOS(filterType, cutoff, getRecord(stages)['dt'], filterOrder)
+    except (TypeError, ValueError):
+        raise PreventUpdate
     
-    # clean the fig
-    fig['data'] = []
+    filterStage = {'type': filterType, 'cutoff': cutoff, 'order': filterOrder}
     
-    # visualize
-    fig['data'].append(filteredScatter)
+    # padding at the ends and the tukey taper, in percent of the record
+    filterStage['padtype'] = None if padding == 'None' else padding.lower()
+    filterStage['taper'] = percentFraction(taper)
     
-    return fig
+    return checkedStages(dict(stages, filter=filterStage))
+
+# period grid input area update, runs in the browser
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='periodGridArea'),
+    Output('logGridArea', 'style'),
+    Output('userGridArea', 'style'),
+    Input('periodGridInput', 'value')
+)
+
+# response spectra of the processed signal
+def getResponseSpectra(responseRequest):
+    processed = getSignal(responseRequest['stages'])
+    
+    # repeated clicks on the same signal and settings are served from the cache
+    return cachedResponseSpectra(np.array(responseRequest['periods']), processed['acceleration'], responseRequest['dampingRatios'], processed['dt'], multiRate=responseRequest['multiRate'])
+
+# damping ratios and period grid of the response spectrum inputs, checked before the job takes a slot
+def responseInputs(stages, dampingRatio, quantity, grid, minPeriod, maxPeriod, numberPeriods, userPeriods, multiRate, click):
+    if click is None:
+        raise PreventUpdate
+    
+    # the record has to be there, recordExpired tells the user otherwise
+    getRecord(stages)
+    
+    # one or more damping ratios, all spectra come from a single call
+    try:
+        dampingRatios = [float(x)/100 for x in str(dampingRatio).replace(',', ' ').split()]
+    except ValueError:
+        raise PreventUpdate
+    
+    if not dampingRatios:
+        raise PreventUpdate
+    
+    # get the period grid, independent of the record length
+    gridKind = {'Logarithmic': 'log', 'NGA-West2': 'nga', 'User-Defined': 'user'}[grid]
+    try:
+        periods = periodGrid(gridKind, minPeriod, maxPeriod, numberPeriods, userPeriods)
+    except (TypeError, ValueError):
+        raise PreventUpdate
+    
+    return dampingRatios, periods
 
 # create response spectrum
 @callback(
     Output('defaultResponseFig', 'figure'),
+    Output('responseStore', 'data'),
     [
-        State('signalFig', 'figure'),
-        State('defaultResponseFig', 'figure'),
+        State('pipelineStore', 'data'),
         State('dampingRatioInput', 'value'),
+        State('responseQuantityInput', 'value'),
+        State('periodGridInput', 'value'),
+        State('minPeriodInput', 'value'),
+        State('maxPeriodInput', 'value'),
+        State('numberPeriodsInput', 'value'),
+        State('userPeriodsInput', 'value'),
+        State('multiRateInput', 'value'),
     ],
-    Input('createResponse', 'n_clicks')
+    Input('createResponse', 'n_clicks'),
+    background=True,
+    progress=Output('responseProgress', 'children'),
+    running=[(Output('responseProgress', 'style'), {'display': 'block'}, {'display': 'none'})],
+    cancel=[Input('url', 'pathname')],
 )
-def createResponseSpectrum(signalFig, responseFig, dampingRatio, click):
-    if click is None:
-        raise PreventUpdate
+@heavyJob('Computing response spectra...', check=responseInputs)
+def createResponseSpectrum(setProgress, stages, dampingRatio, quantity, grid, minPeriod, maxPeriod, numberPeriods, userPeriods, multiRate, click):
+    dampingRatios, periods = responseInputs(stages, dampingRatio, quantity, grid, minPeriod, maxPeriod, numberPeriods, userPeriods, multiRate, click)
     
     # line color
     lineColor = 'blue'
-
-    # get the current data
-    accData = pd.DataFrame({'x': signalFig['data'][0]['x'], 'y': signalFig['data'][0]['y']})
     
-    # get the delta
-    delta = accData['x'][1] - accData['x'][0]
-    
-    dampingRatio = dampingRatio/100
-    
-    response = ResponseSpectrum(accData['x'].to_list(), accData['y'].to_list(), dampingRatio, delta)
-    
-    responseFrame = pd.DataFrame({'x': signalFig['data'][0]['x'], 'y': response})
-    
-    # create scatter
-    responseScatter = go.Scatter(
-        x = responseFrame['x'],
-        y = responseFrame['y'],
-        line=dict(color=lineColor)
-    )
+    # settings of the spectrum, the export reads them back from the cache
+    responseRequest = {
+        'stages': stages,
+        'periods': periods.tolist(),
+        'dampingRatios': dampingRatios,
+        'quantity': quantity,
+        'multiRate': bool(multiRate),
+    }
+    spectra = getResponseSpectra(responseRequest)
     
     # clean the fig
+    responseFig = Patch()
     responseFig['data'] = []
     
-    # visualize
-    responseFig['data'].append(responseScatter)
+    # visualize, one trace per damping ratio
+    for ratio, response in zip(spectra['damping'], spectra[quantity]):
+        responseScatter = figureTrace(
+            x = spectra['T'],
+            y = response,
+            name = f'{ratio*100:g}%',
+            **({'line': dict(color=lineColor)} if len(dampingRatios) == 1 else {})
+        )
+        responseFig['data'].append(responseScatter)
+    
+    responseFig['layout']['yaxis']['title'] = {'text': quantity}
     
-    return responseFig
+    return responseFig, responseRequest
 
 @callback(
     Output('defaultAriasFigure', 'figure'),
     [
-        State('signalFig', 'figure'),
-        State('defaultAriasFigure', 'figure'),
+        State('pipelineStore', 'data'),
     ],
     Input('createArias', 'n_clicks')
 )
-def createAriasFigure(signalFig, ariasFig, click):
+def createAriasFigure(stages, click):
     if click is None:
         raise PreventUpdate
     
+    ariasFig = Patch()
+    
     # line color
     lineColor = 'blue'
     
-    # get the data     
-    accData = pd.DataFrame({'x': signalFig['data'][0]['x'], 'y': signalFig['data'][0]['y']})
+    # get the intensity index of the processed data
+    index = getIntensityIndex(stages)
     
     # get the sample
-    sample = accData['x'][1] - accData['x'][0]
+    sample = index.dt
     
     # get the arias dict
-    ariasDict = ariasIntensityCreator(accData['y'].to_list(), sample)
+    ariasDict = ariasIntensityCreator(index.acc, sample, index=index)
         
     # clean the fig
     ariasFig['data'] = []
@@ -714,10 +971,11 @@ def createAriasFigure(signalFig, ariasFig, click):
     ariasFig['layout']['annotations'] = []
 
     # create arias scatter
-    ariasScatter = go.Scatter(
+    ariasTime, ariasIntensity = visibleWindow(ariasDict['ariasTime'], ariasDict['ariasIntensity'])
+    ariasScatter = figureTrace(
         name='Arias Intensity',
-        x = ariasDict['ariasTime'],
-        y = ariasDict['ariasIntensity'],
+        x = ariasTime,
+        y = ariasIntensity,
         line=dict(color=lineColor)
     )
     
@@ -733,7 +991,7 @@ def createAriasFigure(signalFig, ariasFig, click):
         'x0': startTime,
         'y0': 0,
         'x1': endTime,
-        'y1': max(ariasDict['ariasIntensity']),
+        'y1': ariasDict['ariasIntensity'][-1],
         'fillcolor': 'Red',
         'opacity': 0.2,
         'name': 'Significant Duration',
@@ -743,16 +1001,13 @@ def createAriasFigure(signalFig, ariasFig, click):
     }
     
     # add shape to the figure's layout
-    if 'shapes' not in ariasFig['layout']:
-        ariasFig['layout']['shapes'] = []
-    
     ariasFig['layout']['shapes'].append(shape)
     
     significantDuration = round(float(ariasDict['durationAriasIntensity']), 2)
     # add text
     annotation = {
         'x': (endTime-startTime) - (endTime-startTime)/3,
-        'y': max(ariasDict['ariasIntensity']) + sample,
+        'y': ariasDict['ariasIntensity'][-1] + sample,
         'xref': 'x',
         'yref': 'y',
         'text': f'Significant Duration: {significantDuration} sec',
@@ -765,9 +1020,6 @@ def createAriasFigure(signalFig, ariasFig, click):
     }
     
     # add annotation to the figure's layout
-    if 'annotations' not in ariasFig['layout']:
-        ariasFig['layout']['annotations'] = []
-    
     ariasFig['layout']['annotations'].append(annotation)
     
     # add lines for 5% and 95%
@@ -775,7 +1027,7 @@ def createAriasFigure(signalFig, ariasFig, click):
         'type': 'line',
         'x0': 0,
         'y0': ariasDict['arias05'],
-        'x1': max(ariasDict['ariasTime']),
+        'x1': ariasDict['ariasTime'][-1],
         'y1': ariasDict['arias05'],
         'line': {
             'color': 'gray',
@@ -789,7 +1041,7 @@ def createAriasFigure(signalFig, ariasFig, click):
         'type': 'line',
         'x0': 0,
         'y0': ariasDict['arias95'],
-        'x1': max(ariasDict['ariasTime']),
+        'x1': ariasDict['ariasTime'][-1],
         'y1': ariasDict['arias95'],
         'line': {
             'color': 'gray',
@@ -804,7 +1056,7 @@ def createAriasFigure(signalFig, ariasFig, click):
     
     # Add annotations for 5% and 95% lines
     annotation_5 = {
-        'x': max(ariasDict['ariasTime']),
+        'x': ariasDict['ariasTime'][-1],
         'y': ariasDict['arias05'],
         'xref': 'x',
         'yref': 'y',
@@ -818,7 +1070,7 @@ def createAriasFigure(signalFig, ariasFig, click):
     }
     
     annotation_95 = {
-        'x': max(ariasDict['ariasTime']),
+        'x': ariasDict['ariasTime'][-1],
         'y': ariasDict['arias95'],
         'xref': 'x',
         'yref': 'y',
@@ -839,31 +1091,43 @@ def createAriasFigure(signalFig, ariasFig, click):
 @callback(
     Output('defaultFourierFig', 'figure'),
     [
-        State('signalFig', 'figure'),
-        State('defaultFourierFig', 'figure'),
+        State('pipelineStore', 'data'),
+        State('fourierSmoothingInput', 'value'),
+        State('fourierBandwidthInput', 'value'),
+        State('fourierTaperInput', 'value'),
+        State('fourierPadInput', 'value'),
     ],
     Input('createFourier', 'n_clicks')
 )
-def createFourierFigure(signalFig, fourierFig, click):
+def createFourierFigure(stages, smoothing, bandwidth, taper, pad, click):
     if click is None:
         raise PreventUpdate
     
+    fourierFig = Patch()
+    
     # line color
     lineColor = 'blue'
     
-    # get the data     
-    accData = pd.DataFrame({'x': signalFig['data'][0]['x'], 'y': signalFig['data'][0]['y']})
+    # get the processed data
+    processed = getSignal(stages)
     
     # get the sample
-    sample = accData['x'][1] - accData['x'][0]
+    sample = processed['dt']
     
     # perform fourier transform
-    freq, amp = fourierTransform(accData['y'].to_list(), sample, len(accData['y'].to_list()))
+    npts = len(processed['acceleration'])
+    nfft = next_fast_len(npts, real=True) if pad else npts
+    freq, amp = fourierTransform(processed['acceleration'], sample, nfft, taper=percentFraction(taper))
+    
+    # smooth on a log frequency grid, the raw spectrum of a long record is too large to plot
+    if smoothing != 'None':
+        kind = 'konno' if smoothing == 'Konno-Ohmachi' else 'log'
+        freq, amp = smoothFourier(amp, nfft, sample, bandwidth or 40, kind=kind)
     
     # clean the fig
     fourierFig['data'] = []
     
-    fourierTrace = go.Scatter(
+    fourierTrace = figureTrace(
         x = freq,
         y = amp,
         line=dict(color = lineColor)
@@ -874,23 +1138,92 @@ def createFourierFigure(signalFig, fourierFig, click):
     
     return fourierFig
 
+# spectrogram and welch psd
+@callback(
+    Output('defaultSpectrogramFig', 'figure'),
+    Output('defaultPSDFig', 'figure'),
+    [
+        State('pipelineStore', 'data'),
+        State('stftWindowInput', 'value'),
+        State('stftOverlapInput', 'value'),
+        State('welchWindowInput', 'value'),
+    ],
+    Input('createSpectrogram', 'n_clicks')
+)
+def createSpectrogramFigure(stages, window, overlap, welchWindow, click):
+    if click is None:
+        raise PreventUpdate
+    
+    spectrogramFig = Patch()
+    psdFig = Patch()
+    
+    # get the processed data
+    processed = getSignal(stages)
+    overlap = percentFraction(overlap, 95)
+    
+    # the image has a fixed size, whatever the record length
+    image = spectrogramImage(processed['acceleration'], processed['dt'], int(window or 256), overlap)
+    freq, psd = welchPSD(processed['acceleration'], processed['dt'], int(welchWindow or 1024), 0.5)
+    
+    # clean the figs
+    spectrogramFig['data'] = []
+    psdFig['data'] = []
+    
+    spectrogramTrace = heatmapTrace(
+        x = image['time'] + processed['time'][0],
+        y = image['frequency'],
+        z = np.round(image['power'], 1),
+        colorscale='Viridis',
+        colorbar=dict(title='dB')
+    )
+    spectrogramFig['data'].append(spectrogramTrace)
+    
+    # dc is left out of the log axis
+    psdTrace = figureTrace(
+        x = freq[1:],
+        y = psd[1:],
+        line=dict(color='blue')
+    )
+    psdFig['data'].append(psdTrace)
+    
+    return spectrogramFig, psdFig
+
+# intensity measures table
+@callback(
+    Output('intensityTable', 'children'),
+    State('pipelineStore', 'data'),
+    State('bracketThresholdInput', 'value'),
+    Input('createIntensity', 'n_clicks')
+)
+def createIntensityTable(stages, threshold, click):
+    if click is None:
+        raise PreventUpdate
+    
+    # measures share the cached intensity index of the arias tab, and the spectrum goes through the spectrum cache
+    record = getRecord(stages)
+    index = getIntensityIndex(stages)
+    measures = intensityMeasures(index.acc, index.dt, record['unit'], bracketThreshold=threshold or 0.05, index=index, responseSpectra=cachedResponseSpectra)
+    
+    measureFrame = pd.DataFrame({
+        'col_1': list(measures),
+        'col_2': [f'{value:.4g}' for value in measures.values()],
+        'col_3': [measureUnits[name] for name in measures],
+    })
+    
+    return generate_table(measureFrame)
+
 # update metadata
 @callback(
     Output('metadataTable', 'children'),
     State('uploadedDataStore', 'data'),
-    State('uploadData', 'filename'),
-    State('metadataTable', 'figure'),
     Input('getMetadata', 'n_clicks')
 )
-def getMetadata(contents, filename, table, click):
-    if contents is None:
-        raise PreventUpdate
+def getMetadata(recordData, click):
+    record = getRecord(recordData)
+    upMetadata = record['metadata']
     
     # create metadata table for at2
-    if filename.endswith('AT2'):
-        at2Object = AT2(contents)
-        upMetadata = at2Object.metadata()
-        
+    if record['kind'] == 'AT2':
         metadatadict = {
                 'col_1': ['Location', 'Date', 'Orientation'],
                 'col_2': [upMetadata[0], upMetadata[1], upMetadata[2]],
@@ -899,11 +1232,8 @@ def getMetadata(contents, filename, table, click):
         
         return generate_table(metadataframe)
         
-    # create metadata table for at2
-    elif filename.endswith('asc'):
-        ascObject = ASC(contents)
-        upMetadata = ascObject.metadata()
-        
+    # create metadata table for asc
+    elif record['kind'] == 'ASC':
         keys, values = [], []
         
         for key, value in upMetadata.items():
@@ -923,15 +1253,13 @@ def getMetadata(contents, filename, table, click):
 @callback(
     Output('downloadAcceleration', 'data'),
     Input('exportAccButton', 'n_clicks'),
-    State('signalFig', 'figure'),
+    State('pipelineStore', 'data'),
     prevent_initial_call = True
 )
-def downloadAcceleration(click, fig):
-    if fig and fig['data']:
-        accData = fig['data'][0]
-        time = accData['x']
-        acc = accData['y']
-        accFrame = pd.DataFrame({'Time': time, 'Acceleration': acc})
+def downloadAcceleration(click, stages):
+    if stages:
+        processed = getSignal(stages)
+        accFrame = pd.DataFrame({'Time': processed['time'], 'Acceleration': processed['acceleration']})
     else:
         accFrame = pd.DataFrame(columns=['Time', 'Acceleration'])
         
@@ -941,16 +1269,16 @@ def downloadAcceleration(click, fig):
 @callback(
     Output('downloadResponse', 'data'),
     Input('exportResponseButton', 'n_clicks'),
-    State('defaultResponseFig', 'figure'),
+    State('responseStore', 'data'),
     prevent_initial_call = True
 )
-def downloadResponse(click, fig):
-    if fig and fig['data']:
-        responseData = fig['data'][0]
-        time = responseData['x']
-        sa = responseData['y']
-        responseFrame = pd.DataFrame({'Time': time, 'Sa': sa})
+def downloadResponse(click, responseRequest):
+    if responseRequest:
+        spectra = getResponseSpectra(responseRequest)
+        responseFrame = pd.DataFrame({'Period': spectra['T']})
+        for ratio, response in zip(spectra['damping'], spectra[responseRequest['quantity']]):
+            responseFrame[f'{ratio*100:g}%'] = response
     else:
-        responseFrame = pd.DataFrame(columns=['Time', 'Sa'])
+        responseFrame = pd.DataFrame(columns=['Period', 'Sa'])
         
     return dcc.send_data_frame(responseFrame.to_excel, "exportedResponseSpectrum.xlsx", sheet_name="Sheet1", index=False)
\ No newline at end of file
@@ -1,128 +1,237 @@
-import pandas as pd
+import numpy as np
 import re
-import base64
+import logging
 
-class AT2:
+logger = logging.getLogger(__name__)
+
+# first line that holds a single number, where the ASC data block starts
+ascDataPattern = re.compile(r'^[ \t\r]*-?\d+(\.\d+)?[ \t\r]*$', re.MULTILINE)
+
+def parseNumbers(text):
+    # tokenize a whitespace separated numeric block in one call, None if a token is not a number
+    try:
+        return np.array(text.split(), dtype=np.float64)
+    except ValueError:
+        return None
+
+# numerical lines of an ASC data block, the other lines are skipped
+ascLinePattern = re.compile(r'^[ \t\r]*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)[ \t\r]*$', re.MULTILINE)
+
+def readChunks(file, firstText='', chunkSize=4 * 2**20):
+    # text blocks that end on a line break or a whitespace, so no number is cut in two
+    carry = firstText
     
-    # init function
-    def __init__(self, fileContents):
-        
-        # read file
-        contentType, contentString = fileContents.split(',')
-        decoded = base64.b64decode(contentString)
-        self.lines = decoded.decode('utf-8').split('\n')
-            
-    def metadata(self):
+    while True:
+        chunk = file.read(chunkSize)
+        if not chunk:
+            break
+        
+        text = carry + chunk
+        cut = text.rfind('\n')
+        if cut < 0:
+            cut = max(text.rfind(' '), text.rfind('\t'))
+        if cut < 0:
+            carry = text
+            continue
+        
+        yield text[:cut + 1]
+        carry = text[cut + 1:]
+    
+    if carry:
+        yield carry
 
-        # extract metadata
-        self.metadataLine = self.lines[1].strip().split(',')
-        self.location = self.metadataLine[0].strip()
-        self.date = self.metadataLine[1].strip()
-        self.orientation = self.metadataLine[-1].strip()
-        
-        metadata = [self.location, self.date, self.orientation]
-        
-        return metadata
+class SampleBuffer:
+    # fills a preallocated array block by block, grows only if the size is not known
     
-    def accdata(self):
-        
-        # extract npts and dt
-        self.nptsdtLine = self.lines[3].strip()
-        
-        # Using regular expressions to extract NPTS and DT values
-        self.nptsMatch = re.search(r'NPTS\s*=\s*(\d+)', self.nptsdtLine)
-        self.dtMatch = re.search(r'DT\s*=\s*([.\d]+)\s*SEC', self.nptsdtLine)
+    def __init__(self, size=None):
+        self.values = np.empty(size if size is not None else 2**16)
+        self.fixed = size is not None
+        self.count = 0
+    
+    def append(self, block):
+        end = self.count + len(block)
+        
+        if end > len(self.values):
+            if self.fixed:
+                # only count the extra samples for the error message
+                self.count = end
+                return
+            self.values = np.resize(self.values, max(end, 2 * len(self.values)))
+        
+        self.values[self.count:end] = block
+        self.count = end
+    
+    def array(self):
+        return self.values[:self.count] if not self.fixed else self.values
 
-        if self.nptsMatch and self.dtMatch:
-            self.npts = int(self.nptsMatch.group(1))
-            self.dt = float(self.dtMatch.group(1))
-        else:
-            raise ValueError("NPTS or DT information is missing or in an unexpected format.")
-        
-        # extract acceleration data
-        self.accelerationData = []
-        for line in self.lines[4:]:
-            values = line.strip().split()
-            for value in values:
-                self.accelerationData.append(float(value))
+def readAT2File(path, chunkSize=4 * 2**20):
+    """
+    Reads an AT2 file in blocks, the samples are written into an array sized from NPTS.
 
-        # check if the number of acceleration points matches NPTS
-        if len(self.accelerationData) != self.npts:
-            raise ValueError(f"Number of acceleration points ({len(self.accelerationData)}) does not match NPTS ({self.npts})")
+    Args:
+        path (str): path of the file
+        chunkSize (int): characters read at once
+    Returns:
+        dict: time, acceleration, dt, npts, unit ('g') and metadata (location, date, orientation)
+    """
+    with open(path, encoding='utf-8') as file:
+        lines = [file.readline() for _ in range(4)]
+        
+        # metadata and npts, dt from the header lines
+        metadata = AT2.readMetadata(lines[1])
+        npts, dt = AT2.readNptsDt(lines[3])
+        
+        samples = SampleBuffer(npts)
+        for text in readChunks(file, chunkSize=chunkSize):
+            samples.append(AT2.readValues(text))
+    
+    AT2.checkPoints(samples.count, npts)
+    
+    return AT2.makeRecord(samples.array(), dt, metadata)
 
-        self.timeValues = [i * self.dt for i in range(self.npts)]
+def readASCFile(path, chunkSize=4 * 2**20):
+    """
+    Reads an ASC file in blocks, the samples are written into an array sized from NDATA.
 
-        accData = pd.DataFrame({
-            'Time (s)': self.timeValues,
-            'Acceleration (g)': self.accelerationData
-        })
+    Args:
+        path (str): path of the file
+        chunkSize (int): characters read at once
+    Returns:
+        dict: time, acceleration, dt, npts, unit ('cm/s^2') and metadata (header key to value)
+    """
+    with open(path, encoding='utf-8') as file:
+        
+        # metadata lines until the first line with a single number
+        metadataLines = []
+        firstLine = ''
+        for line in file:
+            if ascDataPattern.match(line):
+                firstLine = line
+                break
+            metadataLines.append(line)
         
-        return accData
+        metadata = ASC.readMetadata(metadataLines)
+        dt, ndata = ASC.readSampling(metadata)
+        
+        samples = SampleBuffer(ndata)
+        skipped = 0
+        for text in readChunks(file, firstLine, chunkSize=chunkSize):
+            block, invalid = ASC.readValues(text)
+            skipped += invalid
+            samples.append(block)
+    
+    ASC.logSkipped(skipped)
+    ASC.checkPoints(samples.count, samples.count if ndata is None else ndata)
+    
+    return ASC.makeRecord(samples.array(), dt, metadata)
 
-class ASC:
+class AT2:
+    # header and data parsing of PEER AT2 files, used by readAT2File
     
-    # init function
-    def __init__(self, fileContents):
+    @staticmethod
+    def readMetadata(line):
+        # location, date and orientation from the second header line
+        metadataLine = line.strip().split(',')
         
-        # read file
-        contentType, contentString = fileContents.split(',')
-        decoded = base64.b64decode(contentString)
-        self.lines = decoded.decode('utf-8').split('\n')
+        return [metadataLine[0].strip(), metadataLine[1].strip() if len(metadataLine) > 1 else '', metadataLine[-1].strip()]
+    
+    @staticmethod
+    def readNptsDt(line):
+        # Using regular expressions to extract NPTS and DT values
+        nptsMatch = re.search(r'NPTS\s*=\s*(\d+)', line)
+        dtMatch = re.search(r'DT\s*=\s*([.\d]+)\s*SEC', line)
         
-        # init metadata
-        self.metadataDict = {}
+        if not (nptsMatch and dtMatch):
+            raise ValueError("NPTS or DT information is missing or in an unexpected format.")
+        
+        return int(nptsMatch.group(1)), float(dtMatch.group(1))
     
-    def metadata(self):
+    @staticmethod
+    def readValues(text):
+        values = parseNumbers(text)
         
-        # extract metadata
-        metadataLines = []
+        if values is None:
+            raise ValueError("Acceleration data contains values that are not numbers.")
         
-        for line in self.lines:
-            # check if the line contains a valid numerical value
-            if re.match(r'^-?\d+(\.\d+)?$', line.strip()):
-                break
-            metadataLines.append(line.strip())
+        return values
+    
+    @staticmethod
+    def checkPoints(count, npts):
+        # check if the number of acceleration points matches NPTS
+        if count != npts:
+            raise ValueError(f"Number of acceleration points ({count}) does not match NPTS ({npts})")
+    
+    @staticmethod
+    def makeRecord(acceleration, dt, metadata):
+        # float64 arrays with metadata
+        return {
+            'time': np.arange(len(acceleration)) * dt,
+            'acceleration': acceleration,
+            'dt': dt,
+            'npts': len(acceleration),
+            'unit': 'g',
+            'metadata': metadata
+        }
+
+class ASC:
+    # header and data parsing of ASC files, used by readASCFile
+    
+    @staticmethod
+    def readMetadata(lines):
+        # key: value lines before the data block
+        metadata = {}
         
-        for line in metadataLines:
+        for line in lines:
             if ':' in line:
-                key, value = line.split(':', 1)
-                self.metadataDict[key.strip()] = value.strip()
-        
-        return self.metadataDict
-    
-    def accdata(self):
-        # find where the acceleration data starts
-        dataStartIndex = 0
-        for i, line in enumerate(self.lines):
-            # check if the line contains a valid numerical value
-            if re.match(r'^-?\d+(\.\d+)?$', line.strip()):
-                dataStartIndex = i
-                break
-        
-        # extract acceleration data
-        self.accelerationData = []
-        for line in self.lines[dataStartIndex:]:
-            line = line.strip().replace(',', '.')
-            if line:  # Skip empty lines
-                try:
-                    self.accelerationData.append(float(line))
-                except ValueError:
-                    print(f"Skipping invalid line: {line}")
+                key, value = line.strip().split(':', 1)
+                metadata[key.strip()] = value.strip()
         
-        # extract sampling interval and number of data points from metadata
-        self.dt = float(self.metadataDict.get('SAMPLING_INTERVAL_S', 0.01))
-        self.ndata = int(self.metadataDict.get('NDATA', len(self.accelerationData)))
+        return metadata
+    
+    @staticmethod
+    def readSampling(metadata):
+        # sampling interval and number of points, None if NDATA is not given
+        dt = float(metadata.get('SAMPLING_INTERVAL_S', 0.01))
+        ndata = int(metadata['NDATA']) if 'NDATA' in metadata else None
         
+        return dt, ndata
+    
+    @staticmethod
+    def readValues(text):
+        # values of a data block and the number of lines that are not a single number
+        text = text.replace(',', '.')
+        values = parseNumbers(text)
+        lineCount = sum(1 for line in text.split('\n') if line.strip())
+        
+        # every token a number and as many as the lines, so one number on every line
+        if values is not None and len(values) == lineCount:
+            return values, 0
+        
+        # keep the numerical lines only
+        validLines = ascLinePattern.findall(text)
+        skipped = lineCount - len(validLines)
+        
+        return np.array(validLines, dtype=np.float64), skipped
+    
+    @staticmethod
+    def logSkipped(skipped):
+        if skipped:
+            logger.warning("Skipping %d invalid lines", skipped)
+    
+    @staticmethod
+    def checkPoints(count, ndata):
         # check if the number of acceleration points matches NDATA
-        if len(self.accelerationData) != self.ndata:
-            raise ValueError(f"Number of acceleration points ({len(self.accelerationData)}) does not match NDATA ({self.ndata})")
-        
-        self.timeValues = [i * self.dt for i in range(self.ndata)]
-        
-        accData = pd.DataFrame({
-            'Time (s)': self.timeValues,
-            'Acceleration (cm/s^2)': self.accelerationData
-        })
-        
-        return accData
-    
\ No newline at end of file
+        if count != ndata:
+            raise ValueError(f"Number of acceleration points ({count}) does not match NDATA ({ndata})")
+    
+    @staticmethod
+    def makeRecord(acceleration, dt, metadata):
+        # float64 arrays with metadata
+        return {
+            'time': np.arange(len(acceleration)) * dt,
+            'acceleration': acceleration,
+            'dt': dt,
+            'npts': len(acceleration),
+            'unit': 'cm/s^2',
+            'metadata': metadata
+        }
@@ -0,0 +1,154 @@
+import os
+import re
+import json
+import time
+import hashlib
+import numpy as np
+from applications.eqprocess.record import readAT2File, readASCFile
+from components.cachePaths import recordDirectory
+from components.caches import LRUCache, saveArrays
+
+# record ids are the first 32 hex digits of the sha256 of the file
+recordIdPattern = re.compile(r'^[0-9a-f]{32}$')
+
+def recordKind(filename):
+    # parser for the file extension, None if the format is not supported
+    if filename and filename.endswith('AT2'):
+        return 'AT2'
+    elif filename and filename.endswith('asc'):
+        return 'ASC'
+
+    return None
+
+class RecordStore:
+    """
+    Parsed records kept on the server, keyed by the hash of the file content.
+
+    Args:
+        maxItems (int): number of records kept in memory, least recently used are evicted first
+        ttl (float): seconds a record is kept in memory after its last use
+        directory (str): optional folder of the parsed records as .npz, read back by any process on a miss
+        diskTtl (float): seconds a record file is kept after its last use by any worker
+    """
+
+    # init function
+    def __init__(self, maxItems=32, ttl=3600, directory=None, diskTtl=24 * 3600):
+        self.directory = directory
+        self.diskTtl = diskTtl
+        self.records = LRUCache(maxItems, ttl=ttl, counters=('diskHits',))
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def putFile(self, path, filename):
+        """
+        Parses a file spooled on the server and returns its record id.
+
+        Args:
+            path (str): path of the file
+            filename (str): original file name, AT2 or asc
+        """
+        kind = recordKind(filename)
+        if kind is None:
+            raise ValueError("File format is not supported. Supported formats: AT2, ASC")
+
+        # hash in blocks, the file is never held twice
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(2**20), b''):
+                digest.update(block)
+        recordId = digest.hexdigest()[:32]
+
+        if self.get(recordId) is not None:
+            return recordId
+
+        # streamed into the sample array, the text of the file is never held whole
+        record = readAT2File(path) if kind == 'AT2' else readASCFile(path)
+        self.add(recordId, self.describe(record, kind, filename))
+
+        return recordId
+
+    def describe(self, record, kind, filename):
+        record['kind'] = kind
+        record['filename'] = filename
+
+        return record
+
+    def path(self, recordId):
+        return os.path.join(self.directory, f'{recordId}.npz')
+
+    def save(self, recordId, record):
+        # arrays plus the other fields as json
+        saveArrays(
+            self.path(recordId),
+            time=record['time'],
+            acceleration=record['acceleration'],
+            description=np.array(json.dumps({name: record[name] for name in ('dt', 'npts', 'unit', 'metadata', 'kind', 'filename')})),
+        )
+
+    def load(self, recordId):
+        # parsed record written by any worker, None if it is missing or was cleaned up
+        if not recordIdPattern.match(recordId or ''):
+            return None
+
+        try:
+            with np.load(self.path(recordId)) as data:
+                record = json.loads(str(data['description']))
+                record['time'] = data['time']
+                record['acceleration'] = data['acceleration']
+        except (OSError, ValueError, KeyError):
+            return None
+
+        self.touch(recordId)
+
+        return record
+
+    def touch(self, recordId):
+        # last use of a record by any worker, so prune keeps the file of a record in use
+        try:
+            os.utime(self.path(recordId))
+        except OSError:
+            pass
+
+    def prune(self):
+        # remove record files no worker used within diskTtl
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith('.npz') and now - entry.stat().st_mtime > self.diskTtl:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def add(self, recordId, record):
+        if self.directory:
+            self.prune()
+            self.save(recordId, record)
+
+        self.records.put(recordId, record)
+
+    def get(self, recordId):
+        record = self.records.get(recordId, countMiss=False)
+
+        if record is not None:
+            # other workers read the file, it is kept while this one uses the record
+            if self.directory:
+                self.touch(recordId)
+            return record
+
+        record = self.load(recordId) if self.directory else None
+
+        if record is None:
+            self.records.count('misses')
+            return None
+
+        self.records.count('diskHits')
+        self.records.put(recordId, record)
+
+        return record
+
+    def stats(self):
+        return self.records.stats()
+
+# shared store of the processor page
+recordStore = RecordStore(directory=recordDirectory)
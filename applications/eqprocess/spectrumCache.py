@@ -0,0 +1,125 @@
+import os
+import hashlib
+import numpy as np
+from applications.eqprocess.eqProcessFunctions import ResponseSpectra
+from components.cachePaths import spectrumDirectory
+from components.caches import LRUCache, saveArrays
+
+class SpectrumCache:
+    """
+    Content addressed cache of ResponseSpectra results.
+
+    Args:
+        maxItems (int): number of spectra kept in memory, least recently used are evicted first
+        directory (str): folder of the on-disk tier, it survives worker restarts, None turns it off
+        maxDiskBytes (int): size of the on-disk tier, least recently used files are removed first
+    """
+
+    # init function
+    def __init__(self, maxItems=64, directory=None, maxDiskBytes=256 * 2**20):
+        self.directory = directory
+        self.maxDiskBytes = maxDiskBytes
+        self.memory = LRUCache(maxItems, counters=('diskHits',))
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, T, s, dampings, dt, multiRate=False):
+        # hash of the acceleration array plus every input that changes the result, each
+        # array prefixed by its shape and dtype so different splits of the bytes never collide
+        digest = hashlib.sha256()
+        for array in (s, T, np.atleast_1d(dampings)):
+            array = np.ascontiguousarray(array, dtype=float)
+            digest.update(repr((array.shape, array.dtype.str)).encode())
+            digest.update(array.tobytes())
+        digest.update(repr((float(dt), bool(multiRate))).encode())
+
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key):
+        spectra = self.memory.get(key, countMiss=False)
+        if spectra is not None:
+            return dict(spectra)
+
+        if self.directory and os.path.exists(self.path(key)):
+            try:
+                with np.load(self.path(key)) as data:
+                    spectra = {name: data[name] for name in data.files}
+            except (OSError, ValueError):
+                spectra = None
+
+            if spectra is not None:
+                # a used file is the most recent one for pruning
+                try:
+                    os.utime(self.path(key))
+                except OSError:
+                    pass
+                self.remember(key, spectra)
+                self.memory.count('diskHits')
+                return dict(spectra)
+
+        self.memory.count('misses')
+
+        return None
+
+    def remember(self, key, spectra):
+        # cached arrays are shared between callers, so they are made read-only
+        for array in spectra.values():
+            array.flags.writeable = False
+
+        self.memory.put(key, spectra)
+
+    def put(self, key, spectra):
+        spectra = {name: np.array(array) for name, array in spectra.items()}
+        self.remember(key, spectra)
+
+        if self.directory:
+            saveArrays(self.path(key), **spectra)
+            self.prune()
+
+        return dict(spectra)
+
+    def prune(self):
+        # remove the least recently used files until the on-disk tier fits in maxDiskBytes
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for mtime, size, path in files)
+        for mtime, size, path in sorted(files):
+            if total <= self.maxDiskBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def responseSpectra(self, T, s, dampings, dt, multiRate=False):
+        key = self.key(T, s, dampings, dt, multiRate)
+        spectra = self.get(key)
+
+        if spectra is None:
+            spectra = self.put(key, ResponseSpectra(T, s, dampings, dt, multiRate=multiRate))
+
+        return spectra
+
+    def stats(self):
+        return self.memory.stats()
+
+    def clear(self):
+        self.memory.clear()
+
+# shared cache, the on-disk tier is set in components.cachePaths
+spectrumCache = SpectrumCache(directory=spectrumDirectory)
+
+def cachedResponseSpectra(T, s, dampings, dt, multiRate=False):
+    return spectrumCache.responseSpectra(T, s, dampings, dt, multiRate=multiRate)
@@ -0,0 +1,118 @@
+import numpy as np
+from scipy import signal
+from scipy.fft import rfft, rfftfreq
+from numpy.lib.stride_tricks import sliding_window_view
+
+def frameBlocks(acc, nperseg, step, blockFrames=256):
+    """
+    Overlapping frames of a record, a block of frames at a time, so memory does not grow with the record.
+
+    Args:
+        acc (np.ndarray): acceleration
+        nperseg (int): samples per frame
+        step (int): samples between frame starts
+        blockFrames (int): frames per block
+    Yields:
+        tuple: index of the first frame and the (frames, nperseg) view of the block
+    """
+    nFrames = 1 + (len(acc) - nperseg) // step
+
+    for first in range(0, nFrames, blockFrames):
+        count = min(blockFrames, nFrames - first)
+        start = first * step
+        block = acc[start:start + (count - 1) * step + nperseg]
+
+        yield first, sliding_window_view(block, nperseg)[::step]
+
+def framePower(frames, window):
+    # constant detrend, window and one-sided power of every frame
+    frames = frames - frames.mean(axis=1, keepdims=True)
+
+    return np.square(np.abs(rfft(frames * window, axis=1)))
+
+def frameSettings(npts, nperseg, overlap):
+    # frames never exceed the record, the step is at least one sample
+    nperseg = int(min(nperseg, npts))
+    step = max(1, nperseg - int(round(overlap * nperseg)))
+
+    return nperseg, step
+
+def welchPSD(acc, dt, nperseg=1024, overlap=0.5):
+    """
+    Welch power spectral density with a Hann window, frames are averaged as they are read.
+
+    Args:
+        acc (np.ndarray): acceleration
+        dt (float): sampling interval (s)
+        nperseg (int): samples per frame
+        overlap (float): fraction of a frame shared with the next one
+    Returns:
+        tuple: frequencies (Hz) and one-sided PSD, unit^2/Hz
+    """
+    acc = np.asarray(acc, dtype=float)
+    nperseg, step = frameSettings(len(acc), nperseg, overlap)
+    window = signal.windows.hann(nperseg, sym=False)
+
+    # running sum of the frame powers
+    total = np.zeros(nperseg // 2 + 1)
+    count = 0
+    for first, frames in frameBlocks(acc, nperseg, step):
+        total += framePower(frames, window).sum(axis=0)
+        count += len(frames)
+
+    # density scaling, every bin but dc and nyquist is doubled for the one-sided spectrum
+    psd = total / count * dt / np.sum(np.square(window))
+    psd[1:] *= 2
+    if nperseg % 2 == 0:
+        psd[-1] /= 2
+
+    return rfftfreq(nperseg, dt), psd
+
+def spectrogramImage(acc, dt, nperseg=256, overlap=0.75, nTime=400, nFreq=200):
+    """
+    Spectrogram downsampled to a fixed size image, frames are reduced as they are read.
+
+    Args:
+        acc (np.ndarray): acceleration
+        dt (float): sampling interval (s)
+        nperseg (int): samples per frame
+        overlap (float): fraction of a frame shared with the next one
+        nTime (int): maximum number of image columns
+        nFreq (int): maximum number of image rows
+    Returns:
+        dict: time (s) and frequency (Hz) of the image cells and the mean power in dB, (nFreq, nTime)
+    """
+    acc = np.asarray(acc, dtype=float)
+    nperseg, step = frameSettings(len(acc), nperseg, overlap)
+    window = signal.windows.hann(nperseg, sym=False)
+    nFrames = 1 + (len(acc) - nperseg) // step
+
+    # frequency bins are averaged into rows with one matrix product
+    freq = rfftfreq(nperseg, dt)
+    nFreq = min(nFreq, len(freq))
+    rows = np.minimum((np.arange(len(freq)) * nFreq) // len(freq), nFreq - 1)
+    rowMatrix = np.zeros((len(freq), nFreq))
+    rowMatrix[np.arange(len(freq)), rows] = 1
+    rowMatrix /= rowMatrix.sum(axis=0)
+
+    # frames are averaged into columns
+    nTime = min(nTime, nFrames)
+    image = np.zeros((nTime, nFreq))
+    counts = np.zeros(nTime)
+    for first, frames in frameBlocks(acc, nperseg, step):
+        columns = (np.arange(first, first + len(frames)) * nTime) // nFrames
+        np.add.at(image, columns, framePower(frames, window) @ rowMatrix)
+        np.add.at(counts, columns, 1)
+
+    image /= counts[:, None]
+
+    # cell centers
+    columnFrames = (np.arange(nTime) + 0.5) * nFrames / nTime
+    time = (columnFrames * step + nperseg / 2) * dt
+    frequency = (np.arange(len(freq)) @ rowMatrix) * freq[1] if len(freq) > 1 else freq[:1]
+
+    return {
+        'time': time,
+        'frequency': frequency,
+        'power': 10 * np.log10(np.maximum(image.T, np.finfo(float).tiny)),
+    }
@@ -0,0 +1,164 @@
+import os
+import re
+import json
+import time
+import uuid
+import fcntl
+import tempfile
+from flask import request, jsonify
+from applications.eqprocess.recordStore import recordStore, recordKind
+
+# upload limits, same as the one shown on the processor page
+maxUploadSize = 200 * 2**20
+maxChunkSize = 8 * 2**20
+
+# spool folder of the partial uploads, set SEISKIT_UPLOAD_SPOOL to move it
+spoolDirectory = os.environ.get('SEISKIT_UPLOAD_SPOOL', os.path.join(tempfile.gettempdir(), 'seiskit-uploads'))
+
+# partial uploads older than this are removed
+spoolTtl = 6 * 3600
+
+uploadIdPattern = re.compile(r'^[0-9a-f]{32}$')
+
+def spoolPaths(uploadId):
+    # data file and its json description
+    if not uploadIdPattern.match(uploadId or ''):
+        raise ValueError("Unknown upload.")
+
+    dataPath = os.path.join(spoolDirectory, f'{uploadId}.part')
+    infoPath = os.path.join(spoolDirectory, f'{uploadId}.json')
+
+    return dataPath, infoPath
+
+def readInfo(uploadId):
+    dataPath, infoPath = spoolPaths(uploadId)
+    if not os.path.exists(infoPath):
+        raise ValueError("Unknown upload.")
+
+    with open(infoPath) as file:
+        info = json.load(file)
+
+    # the received offset is always the size of the spooled file
+    info['offset'] = os.path.getsize(dataPath) if os.path.exists(dataPath) else 0
+
+    return info
+
+def removeUpload(uploadId):
+    for path in spoolPaths(uploadId):
+        if os.path.exists(path):
+            os.remove(path)
+
+def cleanSpool():
+    # drop uploads that were abandoned
+    now = time.time()
+    for name in os.listdir(spoolDirectory):
+        path = os.path.join(spoolDirectory, name)
+        try:
+            if now - os.path.getmtime(path) > spoolTtl:
+                os.remove(path)
+        except OSError:
+            pass
+
+def registerUploadRoutes(server, prefix='/eqprocessor/upload'):
+    """
+    Adds the chunked, resumable upload routes of the processor page to the flask server.
+
+    POST {prefix} starts an upload, GET {prefix}/<id> returns the received offset to resume,
+    PUT {prefix}/<id>?offset=<n> appends a raw chunk and POST {prefix}/<id>/finish parses the
+    file into the record store and returns the record handle.
+    """
+    os.makedirs(spoolDirectory, exist_ok=True)
+
+    def failure(message, status=400, **extra):
+        return jsonify(error=message, **extra), status
+
+    @server.route(prefix, methods=['POST'])
+    def startUpload():
+        info = request.get_json(silent=True) or {}
+        filename = os.path.basename(str(info.get('filename', '')))
+
+        try:
+            size = int(info.get('size', -1))
+        except (TypeError, ValueError):
+            size = -1
+
+        if recordKind(filename) is None:
+            return failure("File format is not supported. Supported formats: AT2, ASC")
+        if size < 0:
+            return failure("File size is missing.")
+        if size > maxUploadSize:
+            return failure("File is larger than 200MB.", 413)
+
+        cleanSpool()
+
+        uploadId = uuid.uuid4().hex
+        dataPath, infoPath = spoolPaths(uploadId)
+        open(dataPath, 'wb').close()
+        with open(infoPath, 'w') as file:
+            json.dump({'filename': filename, 'size': size}, file)
+
+        return jsonify(uploadId=uploadId, offset=0, chunkSize=maxChunkSize)
+
+    @server.route(f'{prefix}/<uploadId>', methods=['GET'])
+    def uploadStatus(uploadId):
+        try:
+            info = readInfo(uploadId)
+        except ValueError as e:
+            return failure(str(e), 404)
+
+        return jsonify(uploadId=uploadId, **info)
+
+    @server.route(f'{prefix}/<uploadId>', methods=['PUT'])
+    def uploadChunk(uploadId):
+        try:
+            info = readInfo(uploadId)
+        except ValueError as e:
+            return failure(str(e), 404)
+
+        offset = request.args.get('offset', type=int)
+        length = request.content_length
+
+        dataPath, infoPath = spoolPaths(uploadId)
+        with open(dataPath, 'r+b') as file:
+            # one writer per upload, a retried chunk waits and then sees the offset the other one left
+            fcntl.flock(file, fcntl.LOCK_EX)
+            received = os.fstat(file.fileno()).st_size
+
+            # chunks are only appended, a stale offset gets the current one back to resume from
+            if offset != received:
+                return failure("Offset does not match the received data.", 409, offset=received)
+            if length is None or length > maxChunkSize:
+                return failure("Chunk is too large.", 413, offset=received)
+            if offset + length > info['size']:
+                return failure("Chunk is beyond the declared file size.", 413, offset=received)
+
+            # stream the body to the spool file without holding it in memory
+            file.seek(offset)
+            while True:
+                block = request.stream.read(2**20)
+                if not block:
+                    break
+                file.write(block)
+            file.flush()
+
+            return jsonify(offset=file.tell())
+
+    @server.route(f'{prefix}/<uploadId>/finish', methods=['POST'])
+    def finishUpload(uploadId):
+        try:
+            info = readInfo(uploadId)
+        except ValueError as e:
+            return failure(str(e), 404)
+
+        if info['offset'] != info['size']:
+            return failure("Upload is not complete.", 409, offset=info['offset'])
+
+        dataPath, infoPath = spoolPaths(uploadId)
+        try:
+            recordId = recordStore.putFile(dataPath, info['filename'])
+        except (ValueError, UnicodeDecodeError) as e:
+            return failure(str(e))
+        finally:
+            removeUpload(uploadId)
+
+        return jsonify(recordId=recordId, filename=info['filename'])
@@ -0,0 +1,323 @@
+import os
+import json
+import fcntl
+import shutil
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# csv flatfiles of the ground motion database
+dataDirectory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+metadataFile = 'meta_data-R1.csv'
+spectraFiles = {'x': 'spectral_x.csv', 'y': 'spectral_y.csv'}
+
+# compiled arrays, built from the csv files on first use
+compiledDirectory = os.environ.get('SEISKIT_GM_DATABASE', os.path.join(dataDirectory, 'compiled'))
+
+# bump when the compiled layout changes, older builds are rebuilt
+databaseVersion = 1
+
+def sourceStamp(directory, filename):
+    # size and modification time of a source file, a changed csv triggers a rebuild
+    stat = os.stat(os.path.join(directory, filename))
+
+    return {'file': filename, 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+def readMetadata(path):
+    metadata = pd.read_csv(path)
+
+    # the last column of the flatfile carries trailing separators, e.g. 'Pulse;;;;' and '0;;;'
+    pulseColumn = [column for column in metadata.columns if column.rstrip(';') == 'Pulse']
+    if pulseColumn:
+        metadata = metadata.rename(columns={pulseColumn[0]: 'Pulse'})
+        metadata['Pulse'] = metadata['Pulse'].astype(str).str.rstrip(';').astype(int)
+
+    return metadata
+
+def readSpectra(path):
+    spectra = pd.read_csv(path)
+
+    # period columns are the ones named by a number
+    periodColumns = []
+    for column in spectra.columns:
+        try:
+            float(column)
+        except ValueError:
+            continue
+        periodColumns.append(column)
+
+    return {
+        'rsn': spectra['RSN'].to_numpy(dtype=np.int64),
+        'periods': np.array([float(column) for column in periodColumns]),
+        'values': spectra[periodColumns].to_numpy(dtype=np.float64),
+    }
+
+@contextmanager
+def databaseLock(target=compiledDirectory, exclusive=False):
+    # lock file next to the compiled database, shared while reading and exclusive while building
+    parent = os.path.dirname(os.path.abspath(target))
+    os.makedirs(parent, exist_ok=True)
+
+    with open(os.path.abspath(target) + '.lock', 'a') as file:
+        fcntl.flock(file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+def buildDatabase(source=dataDirectory, target=compiledDirectory):
+    """
+    Compiles the csv flatfiles into .npy arrays and a manifest.
+
+    Metadata columns are stored as typed arrays, numbers as int64 or float64 and text
+    as fixed width unicode. Spectra are (records, periods) float64 matrices. Callers
+    hold the exclusive databaseLock, readers hold the shared one while they load.
+
+    Args:
+        source (str): folder of the csv files
+        target (str): folder of the compiled database, replaced if it exists
+    Returns:
+        dict: manifest of the compiled database
+    """
+    manifest = {'version': databaseVersion, 'sources': [sourceStamp(source, metadataFile)], 'metadata': {}, 'spectra': {}}
+
+    # build next to the target and swap it in
+    parent = os.path.dirname(os.path.abspath(target))
+    os.makedirs(parent, exist_ok=True)
+    building = tempfile.mkdtemp(prefix='.building-', dir=parent)
+    retired = None
+
+    try:
+        metadata = readMetadata(os.path.join(source, metadataFile))
+        for number, column in enumerate(metadata.columns):
+            values = metadata[column]
+            array = values.to_numpy() if values.dtype.kind in 'if' else values.astype(str).to_numpy(dtype=str)
+            filename = f'metadata-{number}.npy'
+            np.save(os.path.join(building, filename), array)
+            manifest['metadata'][column] = {'file': filename, 'dtype': array.dtype.str}
+
+        periods = None
+        for component, filename in spectraFiles.items():
+            manifest['sources'].append(sourceStamp(source, filename))
+            spectra = readSpectra(os.path.join(source, filename))
+
+            if periods is None:
+                periods = spectra['periods']
+                np.save(os.path.join(building, 'periods.npy'), periods)
+            elif not np.array_equal(periods, spectra['periods']):
+                raise ValueError(f"Periods of {filename} do not match {spectraFiles['x']}.")
+
+            np.save(os.path.join(building, f'rsn-{component}.npy'), spectra['rsn'])
+            np.save(os.path.join(building, f'spectra-{component}.npy'), spectra['values'])
+            manifest['spectra'][component] = {'rsn': f'rsn-{component}.npy', 'values': f'spectra-{component}.npy', 'records': len(spectra['rsn'])}
+
+        manifest['periods'] = {'file': 'periods.npy', 'count': len(periods)}
+        manifest['records'] = len(metadata)
+
+        # the manifest is written last, it marks a complete build
+        with open(os.path.join(building, 'manifest.json'), 'w') as file:
+            json.dump(manifest, file, indent=2)
+
+        # rename the old build aside and the new one in, an old build is removed only after the swap
+        if os.path.isdir(target):
+            retired = building + '-retired'
+            os.rename(target, retired)
+        os.rename(building, target)
+    finally:
+        for folder in (building, retired):
+            if folder and os.path.isdir(folder):
+                shutil.rmtree(folder, ignore_errors=True)
+
+    return manifest
+
+def readManifest(target=compiledDirectory):
+    try:
+        with open(os.path.join(target, 'manifest.json')) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+def isCurrent(manifest, source=dataDirectory):
+    if manifest is None or manifest.get('version') != databaseVersion:
+        return False
+
+    # a missing csv keeps the compiled database, it may have been shipped without the sources
+    for stamp in manifest['sources']:
+        if os.path.exists(os.path.join(source, stamp['file'])) and sourceStamp(source, stamp['file']) != stamp:
+            return False
+
+    return True
+
+@lru_cache(maxsize=1)
+def loadDatabase(source=dataDirectory, target=compiledDirectory):
+    """
+    Compiled ground motion database, built if missing or stale and loaded once per process.
+
+    Spectra are memory mapped read-only, so workers on one machine share their pages.
+    Workers that start together build once, the others wait for the build and load it.
+
+    Returns:
+        dict: metadata (column name to array), periods, and rsn and spectra of the 'x' and 'y' components
+    """
+    with databaseLock(target):
+        manifest = readManifest(target)
+        if isCurrent(manifest, source):
+            return openDatabase(manifest, target)
+
+    with databaseLock(target, exclusive=True):
+        # another worker may have built it while this one waited for the lock
+        manifest = readManifest(target)
+        if not isCurrent(manifest, source):
+            missing = [filename for filename in [metadataFile] + list(spectraFiles.values()) if not os.path.exists(os.path.join(source, filename))]
+            if missing:
+                raise FileNotFoundError(f"Ground motion database is not compiled and {', '.join(missing)} not found in {source}.")
+            manifest = buildDatabase(source, target)
+
+        return openDatabase(manifest, target)
+
+def openDatabase(manifest, target):
+    # arrays of a compiled database, called with the database lock held
+    def load(filename, mmap=False):
+        return np.load(os.path.join(target, filename), mmap_mode='r' if mmap else None)
+
+    database = {
+        'metadata': {column: load(entry['file']) for column, entry in manifest['metadata'].items()},
+        'periods': load(manifest['periods']['file']),
+        'rsn': {},
+        'spectra': {},
+    }
+    for component, entry in manifest['spectra'].items():
+        database['rsn'][component] = load(entry['rsn'])
+        database['spectra'][component] = load(entry['values'], mmap=True)
+
+    for array in database['metadata'].values():
+        array.flags.writeable = False
+    database['periods'].flags.writeable = False
+
+    return database
+
+@lru_cache(maxsize=1)
+def metadataFrame():
+    # metadata as a dataframe, shared by the callbacks of a worker, so it is never changed in place
+    return pd.DataFrame(loadDatabase()['metadata'])
+
+# metadata columns with range filters
+rangeColumns = ('Magnitude', 'Vs30(m/sec)', 'Rjb(km)', '5-75%Duration(sec)', '5-95%Duration(sec)', 'AriasIntensity(m/sec)')
+
+@lru_cache(maxsize=1)
+def metadataIndex():
+    """
+    Search structures of the metadata, built once per process.
+
+    Returns:
+        dict: sorted values and row order of every range column, mechanism names and
+        codes, and the rows grouped by earthquake in their original order
+    """
+    metadata = loadDatabase()['metadata']
+    index = {'sorted': {}, 'order': {}}
+
+    for column in rangeColumns:
+        order = np.argsort(metadata[column], kind='stable')
+        index['order'][column] = order
+        index['sorted'][column] = metadata[column][order]
+
+    # mechanism names carry a leading space in the flatfile
+    index['mechanisms'], index['mechanismCodes'] = np.unique(np.char.strip(metadata['Mechanism']), return_inverse=True)
+
+    # rows of every earthquake next to each other, and the first position of each row's earthquake
+    events, eventCodes = np.unique(metadata['EarthquakeName'], return_inverse=True)
+    eventOrder = np.argsort(eventCodes, kind='stable')
+    sortedCodes = eventCodes[eventOrder]
+    index['eventOrder'] = eventOrder
+    index['eventStarts'] = np.searchsorted(sortedCodes, sortedCodes, side='left')
+
+    return index
+
+def queryMetadata(ranges, mechanisms=None, pulse=None, perEvent=None):
+    """
+    Rows of the metadata inside all ranges, found with binary searches on the sorted columns.
+
+    Args:
+        ranges (dict): column of rangeColumns to (min, max), both ends included
+        mechanisms (list): mechanism names without the leading space, None for any
+        pulse (int): value of the Pulse column, None for any
+        perEvent (int): keep only the first rows of every earthquake among the matching rows
+    Returns:
+        np.ndarray: matching row numbers in ascending order
+    """
+    index = metadataIndex()
+    metadata = loadDatabase()['metadata']
+
+    # the narrowest range gives the candidates, the others are checked on them only
+    bounds = {}
+    for column, (low, high) in ranges.items():
+        values = index['sorted'][column]
+        bounds[column] = (np.searchsorted(values, low, side='left'), np.searchsorted(values, high, side='right'))
+
+    if bounds:
+        narrowest = min(bounds, key=lambda column: bounds[column][1] - bounds[column][0])
+        start, end = bounds[narrowest]
+        rows = np.sort(index['order'][narrowest][start:end])
+    else:
+        narrowest = None
+        rows = np.arange(len(index['mechanismCodes']))
+
+    for column, (low, high) in ranges.items():
+        if column != narrowest:
+            values = metadata[column][rows]
+            rows = rows[(values >= low) & (values <= high)]
+
+    if pulse is not None:
+        rows = rows[metadata['Pulse'][rows] == pulse]
+
+    if mechanisms is not None:
+        codes = np.flatnonzero(np.isin(index['mechanisms'], mechanisms))
+        rows = rows[np.isin(index['mechanismCodes'][rows], codes)]
+
+    if perEvent is not None:
+        # rank of every matching row among the matching rows of its earthquake
+        matched = np.zeros(len(index['mechanismCodes']), dtype=bool)
+        matched[rows] = True
+        grouped = matched[index['eventOrder']]
+        counts = np.cumsum(grouped)
+        before = np.where(index['eventStarts'] > 0, counts[index['eventStarts'] - 1], 0)
+        keep = grouped & (counts - before <= perEvent)
+        rows = np.sort(index['eventOrder'][keep])
+
+    return rows
+
+@lru_cache(maxsize=2)
+def spectraIndex(component):
+    # RSN of a component sorted, with the matrix row of each, for binary search lookups
+    rsn = loadDatabase()['rsn'][component]
+    order = np.argsort(rsn, kind='stable')
+
+    return rsn[order], order
+
+def gatherSpectra(component, rsnList):
+    """
+    Spectra of records, gathered from the matrix of a component with one fancy index.
+
+    Args:
+        component (str): 'x' or 'y'
+        rsnList (list): record sequence numbers
+    Returns:
+        np.ndarray: (len(rsnList), periods) spectra, rows in the order of rsnList
+    """
+    sortedRsn, order = spectraIndex(component)
+    rsnList = np.asarray(rsnList, dtype=np.int64)
+
+    # the first row of a repeated RSN is used
+    positions = np.minimum(np.searchsorted(sortedRsn, rsnList), max(len(sortedRsn) - 1, 0))
+    found = sortedRsn[positions] == rsnList if len(sortedRsn) else np.zeros(len(rsnList), dtype=bool)
+    if not found.all():
+        raise ValueError(f"No {component} spectra for RSN {', '.join(str(rsn) for rsn in rsnList[~found])}.")
+
+    return np.asarray(loadDatabase()['spectra'][component][order[positions]])
+
+if __name__ == '__main__':
+    with databaseLock(exclusive=True):
+        manifest = buildDatabase()
+    print(f"Compiled {manifest['records']} records and {manifest['periods']['count']} periods to {compiledDirectory}")
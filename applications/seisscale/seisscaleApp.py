@@ -1,4 +1,4 @@
-from dash import html, dcc, callback, Output, Input, State, callback_context
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Output, Input, State, callback_context, Patch
 from dash.exceptions import PreventUpdate
 import dash_mantine_components as dmc
 import dash_bootstrap_components as dbc
@@ -10,6 +10,8 @@ import io
 from applications.seisscale.seisscaleFunctions import targetSpectrum, recordSelection, amplitudeScaling
 from applications.asce.asceFunctions import getAsceDataMulti, getAsceDataMultiMCEr, getAsceDataTwo, getAsceDataTwoMCEr
 from components.navbar import navbar
+from components.figures import figureTrace
+from components.jobs import heavyJob
 
 # title
 seisScaleTitle = dmc.Text("🚀 SeisScale", className='fs-3 mx-3 mb-1 mt-3')
@@ -208,6 +210,7 @@ filterInput = html.Div([
     dbc.Label("Number of Ground Motions to be Scaled", className="mb-1 mt-2 mx-1"),
     dbc.Input(type="number", id="numberOfMotionsInput", value=11, className="mb-2 mt-1"),
     dbc.Button("Find Optimum Selected Ground Motions", id='findOptimumButton', color='primary', className="mb-2 mt-2"),
+    html.Div(id='selectionProgress', className="mb-2 mx-1", style={'display': 'none'}),
 ])
 
 scaleInput = html.Div([
@@ -237,6 +240,7 @@ scaleInput = html.Div([
         className="mt-2 mb-4"
     ),
     dbc.Button("Perform Amplitude Scaling", id='amplitudeScalingInput', color='primary', className="mb-2 mt-2"),
+    html.Div(id='scalingProgress', className="mb-2 mx-1", style={'display': 'none'}),
 ])
 
 initialInputArea = html.Div([responseTypeInput, tbecInputArea, asceInputArea, userDefinedInputArea, responseButton], id="initialInputArea")
@@ -281,8 +285,9 @@ def layout():
             dcc.Download(id="downloadExample")
         ])
     
-# callback to update responseArea
-@callback(
+# callback to update responseArea, runs in the browser (assets/clientside.js)
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='spectrumInputArea'),
     [
         Output('tbecInputArea', 'style'),
         Output('asceInputArea', 'style'),
@@ -293,14 +298,7 @@ def layout():
         Input('spectrumDefinitionInput', 'value')
     ]
 )
-def updateInputArea(type):
-    if type == 'TBEC-2018':
-        return {'display': 'block'}, {'display': 'none'}, {'display': 'none'}, {'display': 'block'}
-    elif type == 'ASCE7-22':
-        return {'display': 'none'}, {'display': 'block'}, {'display': 'none'}, {'display': 'block'}
-    elif type == 'User-Defined':
-        return {'display': 'none'}, {'display': 'none'}, {'display': 'block'}, {'display': 'block'}
-    
+
 # callback for upload status
 @callback(
     Output('uploadStatus', 'children'),
@@ -348,14 +346,14 @@ def downloadExample(click):
     State('asceSiteCategoryInput', 'value'),
     State('uploadCSVButton', 'contents'),
     State('uploadCSVButton', 'filename'),
-    State('defaultFig', 'figure'),
     prevent_initial_call = True
 )
-def createResponseSpectrum(click, type, ss, s1, soil, spectrumType, lat, lon, site, contents, filename, fig):
+def createResponseSpectrum(click, type, ss, s1, soil, spectrumType, lat, lon, site, contents, filename):
     if click is None:
         raise PreventUpdate
     
     # clean the graph
+    fig = Patch()
     fig['data'] = []
     fig['layout']['shapes'] = []
     
@@ -379,7 +377,7 @@ def createResponseSpectrum(click, type, ss, s1, soil, spectrumType, lat, lon, si
         except Exception as e:
             status = 'An error occured while reading the file. Please take a look at the example CSV file format. ❌'
                                 
-        userTrace = go.Scatter(
+        userTrace = figureTrace(
                 x = userResponse['T'],
                 y = userResponse['Sa'],
                 line=dict(color=lineColor),
@@ -400,7 +398,7 @@ def createResponseSpectrum(click, type, ss, s1, soil, spectrumType, lat, lon, si
 
     elif type == 'TBEC-2018':
         tbecResponse = targetSpectrum(ss, s1, soil)
-        tbecTrace = go.Scatter(
+        tbecTrace = figureTrace(
             x = tbecResponse['T'],
             y = tbecResponse['Sa'],
             line=dict(color=lineColor),
@@ -435,7 +433,7 @@ def createResponseSpectrum(click, type, ss, s1, soil, spectrumType, lat, lon, si
         
         asceResponse['Sa'] = [x*9.81 for x in np.interp(asceResponse['T'], asceResponse['T'], asceResponse['Sa'])]
     
-        asceTrace = go.Scatter(
+        asceTrace = figureTrace(
             x = asceResponse['T'],
             y = asceResponse['Sa'],
             line=dict(color=lineColor),
@@ -464,7 +462,6 @@ def createResponseSpectrum(click, type, ss, s1, soil, spectrumType, lat, lon, si
         Input('findOptimumButton', 'n_clicks'),
     ],
     [
-        State('defaultFig', 'figure'),
         State('periodInput', 'value'),
         State('magnitudeRangeInput', 'value'),
         State('vs30RangeInput', 'value'),
@@ -486,11 +483,17 @@ def createResponseSpectrum(click, type, ss, s1, soil, spectrumType, lat, lon, si
         State('uploadCSVButton', 'filename'),
              
     ],
-    prevent_initial_call = True
+    prevent_initial_call = True,
+    background=True,
+    progress=Output('selectionProgress', 'children'),
+    running=[(Output('selectionProgress', 'style'), {'display': 'block'}, {'display': 'none'})],
+    cancel=[Input('url', 'pathname')],
 )
-def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Range, rjgRange, faultMechanism, duration575, duration595, ariasIntensity, numberOfMotions, type, ss, s1, soil, spectrumType, lat, lon, site, contents, filename):
+@heavyJob('Building the target spectrum...')
+def filterFunction(setProgress, clickFilter,clickOptimum, period, magnitudeRange, vs30Range, rjgRange, faultMechanism, duration575, duration595, ariasIntensity, numberOfMotions, type, ss, s1, soil, spectrumType, lat, lon, site, contents, filename):
     
     # clean the fig
+    fig = Patch()
     fig['data'] = []
     fig['layout']['shapes'] = []
     
@@ -517,7 +520,7 @@ def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Ra
         except Exception as e:
             alert = 'An error occured while reading the file. Please take a look at the example CSV file format.'
                     
-        targetTrace = go.Scatter(
+        targetTrace = figureTrace(
                 x = userResponse['T'],
                 y = userResponse['Sa'],
                 line=dict(color=lineColor),
@@ -528,7 +531,7 @@ def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Ra
 
     elif type == 'TBEC-2018':
         tbecResponse = targetSpectrum(ss, s1, soil)
-        targetTrace = go.Scatter(
+        targetTrace = figureTrace(
             x = tbecResponse['T'],
             y = tbecResponse['Sa'],
             line=dict(color=lineColor),
@@ -569,7 +572,7 @@ def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Ra
                 timeIndex, asceInit['twoPeriodMCErSpectrumPeriods'], asceInit['twoPeriodMCErSpectrumOrdinates'])]
             asceResponse = asceResponse.rename(columns={'twoPeriodMCErSpectrumPeriods': 'T', 'twoPeriodMCErSpectrumOrdinates': 'Sa'})
         
-        targetTrace = go.Scatter(
+        targetTrace = figureTrace(
             x = asceResponse['T'],
             y = asceResponse['Sa'],
             line=dict(color=lineColor),
@@ -587,6 +590,7 @@ def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Ra
         fig['data'] = []
         fig['layout']['shapes'] = []
     
+        setProgress('Filtering ground motions...')
         selected_keys, eqe_selected_x, eqe_selected_y, rsn_selected, t, eqe_s = recordSelection(
                                                                                             tupleToStr(magnitudeRange),
                                                                                             tupleToStr(vs30Range),
@@ -602,15 +606,15 @@ def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Ra
                                                                                             )
         
         for name in rsn_selected:
-            filteredTrace_x = go.Scatter(
+            filteredTrace_x = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_x[name],
-                line=dict(color='gray', width=0.3), showlegend=False
+                line=dict(color='gray', width=0.3), showlegend=False, threshold=0
             )
-            filteredTrace_y = go.Scatter(
+            filteredTrace_y = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_y[name],
-                line=dict(color='gray', width=0.3), showlegend=False
+                line=dict(color='gray', width=0.3), showlegend=False, threshold=0
             )
             fig['data'].append(filteredTrace_x)
             fig['data'].append(filteredTrace_y)
@@ -632,6 +636,7 @@ def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Ra
     
     elif triggered_id == 'findOptimumButton':
         
+        setProgress('Finding the optimum ground motions...')
         selected_keys, eqe_selected_x, eqe_selected_y, rsn_selected, t, eqe_s = recordSelection(
                                                                                             tupleToStr(magnitudeRange),
                                                                                             tupleToStr(vs30Range),
@@ -647,15 +652,15 @@ def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Ra
                                                                                             )
         
         for name in selected_keys:
-            selectedTrace_x = go.Scatter(
+            selectedTrace_x = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_x[name],
-                line=dict(color='gray', width=0.4), showlegend=False
+                line=dict(color='gray', width=0.4), showlegend=False, threshold=0
             )
-            selectedTrace_y = go.Scatter(
+            selectedTrace_y = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_y[name],
-                line=dict(color='gray', width=0.4), showlegend=False
+                line=dict(color='gray', width=0.4), showlegend=False, threshold=0
             )
             fig['data'].append(selectedTrace_x)
             fig['data'].append(selectedTrace_y)
@@ -703,13 +708,18 @@ def filterFunction(clickFilter,clickOptimum, fig, period, magnitudeRange, vs30Ra
         State('spectralOrdinateInput', 'value'),
         State('targetShiftInput', 'value'),
         State('rangeCoeffInput', 'value'),        
-        State('defaultFig', 'figure'),
     ],
-    prevent_initial_call = True
+    prevent_initial_call = True,
+    background=True,
+    progress=Output('scalingProgress', 'children'),
+    running=[(Output('scalingProgress', 'style'), {'display': 'block'}, {'display': 'none'})],
+    cancel=[Input('url', 'pathname')],
 )
-def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMechanism, duration575, duration595, ariasIntensity, numberOfMotions, type, ss, s1, soil, spectrumType, lat, lon, site, contents, filename, ordinate, shift, range, fig):
+@heavyJob('Building the target spectrum...')
+def performScaling(setProgress, click, period, magnitudeRange, vs30Range, rjgRange, faultMechanism, duration575, duration595, ariasIntensity, numberOfMotions, type, ss, s1, soil, spectrumType, lat, lon, site, contents, filename, ordinate, shift, range):
     
     # clean the fig
+    fig = Patch()
     fig['data'] = []
     fig['layout']['shapes'] = []
     
@@ -741,7 +751,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         except Exception as e:
             alert = 'An error occured while reading the file. Please take a look at the example CSV file format.'
                     
-        targetTrace = go.Scatter(
+        targetTrace = figureTrace(
                 x = userResponse['T'],
                 y = userResponse['Sa'],
                 line=dict(color=responseColor),
@@ -752,7 +762,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
 
     elif type == 'TBEC-2018':
         tbecResponse = targetSpectrum(ss, s1, soil)
-        targetTrace = go.Scatter(
+        targetTrace = figureTrace(
             x = tbecResponse['T'],
             y = tbecResponse['Sa'],
             line=dict(color=responseColor),
@@ -793,7 +803,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
                 timeIndex, asceInit['twoPeriodMCErSpectrumPeriods'], asceInit['twoPeriodMCErSpectrumOrdinates'])]
             asceResponse = asceResponse.rename(columns={'twoPeriodMCErSpectrumPeriods': 'T', 'twoPeriodMCErSpectrumOrdinates': 'Sa'})
         
-        targetTrace = go.Scatter(
+        targetTrace = figureTrace(
             x = asceResponse['T'],
             y = asceResponse['Sa'],
             line=dict(color=responseColor),
@@ -803,6 +813,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
     
     
     # get selected ground motions
+    setProgress('Selecting ground motions...')
     selected_keys, eqe_selected_x, eqe_selected_y, rsn_selected, t, eqe_s = recordSelection(
                                                                                             tupleToStr(magnitudeRange),
                                                                                             tupleToStr(vs30Range),
@@ -817,6 +828,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
                                                                                             numberOfMotions
                                                                                             )
     
+    setProgress('Scaling ground motions...')
     defaultFrame = pd.DataFrame(
                 columns=["Record Sequence Number", "Earthquake Name", "Station Name", "Scale Factor"], 
                 index=pd.RangeIndex(start=1, stop=numberOfMotions + 1, name='index'))
@@ -834,22 +846,24 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         defaultFrame["Scale Factor"] = list(sf_dict.values())
         
         for name in selected_keys:
-            selected_trace_x = go.Scatter(
+            selected_trace_x = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_x[name],
                 line=dict(color='gray', width=0.4),
-                showlegend=False
+                showlegend=False,
+                threshold=0
             )
-            selected_trace_y = go.Scatter(
+            selected_trace_y = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_y[name],
                 line=dict(color='gray', width=0.4),
-                showlegend=False
+                showlegend=False,
+                threshold=0
             )
             fig['data'].append(selected_trace_x)
             fig['data'].append(selected_trace_y)
         
-        geoMeanTrace = go.Scatter(
+        geoMeanTrace = figureTrace(
             x=selectedTarget['T'],
             y=geo_mean_1st_scaled_df["Mean"],
             name='Geometric Mean Scaled', 
@@ -858,7 +872,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(geoMeanTrace)
         
-        srssMeanTrace = go.Scatter(
+        srssMeanTrace = figureTrace(
             x=selectedTarget['T'],
             y=srss_mean_df['Mean'],
             name = 'SRSS Mean',
@@ -867,7 +881,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(srssMeanTrace)
         
-        srssMeanScaledTrace = go.Scatter(
+        srssMeanScaledTrace = figureTrace(
             x = selectedTarget['T'],
             y = srss_mean_scaled_df['Mean'],
             name='SRSS Mean Scaled',
@@ -878,7 +892,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(targetTrace)
         
-        shiftedTargetTrace = go.Scatter(
+        shiftedTargetTrace = figureTrace(
             x = selectedTarget['T'],
             y = selectedTarget['Sa'] * shift,
             name = 'Shifted Target Spectrum',
@@ -918,22 +932,24 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         defaultFrame["Scale Factor"] = list(sf_dict.values())
         
         for name in selected_keys:
-            selected_trace_x = go.Scatter(
+            selected_trace_x = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_x[name],
                 line=dict(color='gray', width=0.4),
-                showlegend=False
+                showlegend=False,
+                threshold=0
             )
-            selected_trace_y = go.Scatter(
+            selected_trace_y = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_y[name],
                 line=dict(color='gray', width=0.4),
-                showlegend=False
+                showlegend=False,
+                threshold=0
             )
             fig['data'].append(selected_trace_x)
             fig['data'].append(selected_trace_y)
         
-        geoMeanTrace = go.Scatter(
+        geoMeanTrace = figureTrace(
             x=selectedTarget['T'],
             y=geo_mean_1st_scaled_df["Mean"],
             name='Geometric Mean Scaled', 
@@ -942,7 +958,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(geoMeanTrace)
         
-        srssMeanTrace = go.Scatter(
+        srssMeanTrace = figureTrace(
             x=selectedTarget['T'],
             y=srss_mean_df['Mean'],
             name = 'RotD50 Mean',
@@ -951,7 +967,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(srssMeanTrace)
         
-        srssMeanScaledTrace = go.Scatter(
+        srssMeanScaledTrace = figureTrace(
             x = selectedTarget['T'],
             y = srss_mean_scaled_df['Mean'],
             name='RotD50 Mean Scaled',
@@ -962,7 +978,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(targetTrace)
         
-        shiftedTargetTrace = go.Scatter(
+        shiftedTargetTrace = figureTrace(
             x = selectedTarget['T'],
             y = selectedTarget['Sa'] * shift,
             name = 'Shifted Target Spectrum',
@@ -1002,22 +1018,24 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         defaultFrame["Scale Factor"] = list(sf_dict.values())
         
         for name in selected_keys:
-            selected_trace_x = go.Scatter(
+            selected_trace_x = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_x[name],
                 line=dict(color='gray', width=0.4),
-                showlegend=False
+                showlegend=False,
+                threshold=0
             )
-            selected_trace_y = go.Scatter(
+            selected_trace_y = figureTrace(
                 x = selectedTarget['T'],
                 y = eqe_selected_y[name],
                 line=dict(color='gray', width=0.4),
-                showlegend=False
+                showlegend=False,
+                threshold=0
             )
             fig['data'].append(selected_trace_x)
             fig['data'].append(selected_trace_y)
         
-        geoMeanTrace = go.Scatter(
+        geoMeanTrace = figureTrace(
             x=selectedTarget['T'],
             y=geo_mean_1st_scaled_df["Mean"],
             name='Geometric Mean Scaled', 
@@ -1026,7 +1044,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(geoMeanTrace)
         
-        srssMeanTrace = go.Scatter(
+        srssMeanTrace = figureTrace(
             x=selectedTarget['T'],
             y=srss_mean_df['Mean'],
             name = 'RotD100 Mean',
@@ -1035,7 +1053,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(srssMeanTrace)
         
-        srssMeanScaledTrace = go.Scatter(
+        srssMeanScaledTrace = figureTrace(
             x = selectedTarget['T'],
             y = srss_mean_scaled_df['Mean'],
             name='RotD100 Mean Scaled',
@@ -1046,7 +1064,7 @@ def performScaling(click, period, magnitudeRange, vs30Range, rjgRange, faultMech
         
         fig['data'].append(targetTrace)
         
-        shiftedTargetTrace = go.Scatter(
+        shiftedTargetTrace = figureTrace(
             x = selectedTarget['T'],
             y = selectedTarget['Sa'] * shift,
             name = 'Shifted Target Spectrum',
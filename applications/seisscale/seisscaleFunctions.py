@@ -3,12 +3,36 @@ import pandas as pd
 from scipy.interpolate import interp1d
 from pandas.core.frame import DataFrame
 import similaritymeasures
+from applications.seisscale.groundMotionDatabase import loadDatabase, metadataFrame, gatherSpectra, queryMetadata
 
-# Ignores performance warnings
+# Ignores future warnings
 from warnings import simplefilter
-simplefilter(action="ignore", category=pd.errors.PerformanceWarning)
 simplefilter(action="ignore", category=FutureWarning)
 
+# mechanism names of the fault mechanism options
+mechanismNames = {'Strike-Slip': ['strike slip'],
+                  'Normal': ['Normal'],
+                  'Reverse': ['Reverse'],
+                  'Reverse-Oblique': ['Reverse Oblique'],
+                  'Normal-Oblique': ['Normal Oblique'],
+                  'Oblique': ['Normal Oblique', 'Reverse Oblique']}
+
+# values of the Pulse column of the pulse options (-999 unknown, 0 non-pulse, 1 pulse), any other option keeps every record
+pulseValues = {'Pulse': 1, 'Non-Pulse': 0}
+
+def spectraTable(t, rsnList, spectra):
+    # spectra of records as a dataframe with a 'T' column and one column per RSN, built in one go
+    table = pd.DataFrame(np.asarray(spectra).T, columns=list(rsnList))
+    table.insert(0, 'T', t)
+
+    return table
+
+def roundValues(values, digits=4):
+    # python round of every value, np.round rounds some halfway cases differently
+    values = np.asarray(values, dtype=float)
+
+    return np.array([round(value, digits) for value in values.ravel().tolist()]).reshape(values.shape)
+
 def targetSpectrum(Ss, S1, soil):
     """
     Args:
@@ -68,13 +92,8 @@ def targetSpectrum(Ss, S1, soil):
     TB = SD1 / SDs
     TL = 6
     
-    x_spectra = pd.read_csv("applications/seisscale/data/spectral_x.csv")
-    cols = x_spectra.columns.tolist()
-    t = []
-
-    for i in cols[2:]:
-        t.append(float(i))
-    T_list = t
+    # periods of the ground motion spectra
+    T_list = loadDatabase()['periods'].tolist()
         
     Sa = []
     
@@ -127,8 +146,8 @@ def recordSelection(magnitude_range: str = '4 9',
         target_spectra (dataframe): Target Spectra Dataframe
         pulse (int): Pulse [Pulse‐like (1)] or Non-pulse [non‐pulse‐like (0)] or Any[any (2)] indicator
     """
-    # Read the Meta Data
-    eqe_df = pd.read_csv("applications/seisscale/data/meta_data-R1.csv")
+    # Meta Data, loaded once per worker
+    eqe_df = metadataFrame()
 
     # Split Inputs
     min_m, max_m = [float(x) for x in magnitude_range.split()]
@@ -138,86 +157,45 @@ def recordSelection(magnitude_range: str = '4 9',
     min_d_95, max_d_95 = [float(x) for x in duration_5_95_range.split()]
     min_arias, max_arias = [float(x) for x in arias_intensity_range.split()]
 
-    # Filter the Dataframe acc. to the Inputs
-    eqe_s = eqe_df[(eqe_df["Magnitude"] >= min_m) & (eqe_df["Magnitude"] <= max_m) 
-                      & (eqe_df["Vs30(m/sec)"] >= min_vs) & (eqe_df["Vs30(m/sec)"] <= max_vs)
-                      &  (eqe_df["Rjb(km)"] >= min_r) & (eqe_df["Rjb(km)"] <= max_r)
-                      &  (eqe_df["5-75%Duration(sec)"] >= min_d_75) & (eqe_df["5-75%Duration(sec)"] <= max_d_75)
-                      &  (eqe_df["5-95%Duration(sec)"] >= min_d_95) & (eqe_df["5-95%Duration(sec)"] <= max_d_95)
-                      &  (eqe_df["AriasIntensity(m/sec)"] >= min_arias) & (eqe_df["AriasIntensity(m/sec)"] <= max_arias)]
+    # Filter the Dataframe acc. to the Inputs, with range queries on the metadata index
+    ranges = {"Magnitude": (min_m, max_m),
+              "Vs30(m/sec)": (min_vs, max_vs),
+              "Rjb(km)": (min_r, max_r),
+              "5-75%Duration(sec)": (min_d_75, max_d_75),
+              "5-95%Duration(sec)": (min_d_95, max_d_95),
+              "AriasIntensity(m/sec)": (min_arias, max_arias)}
     
     # Pulse type filtering
-    if pulse_type == "Pulse" :
-        eqe_s = eqe_s[ eqe_s["Pulse"] == 1 ]
-    elif pulse_type == "Non-Pulse" :
-        eqe_s = eqe_s[ eqe_s["Pulse"] == 2 ]
-    else :
-        pass
+    pulse = pulseValues.get(pulse_type)
 
     # Mechanism type filtering
-    if fault_mechnanism == 'Strike-Slip':
-        eqe_s = eqe_s[(eqe_s['Mechanism'] == ' strike slip')]
-    
-    elif fault_mechnanism ==  'Normal' :
-        eqe_s = eqe_s[(eqe_s['Mechanism'] == ' Normal')]
-          
-    elif fault_mechnanism ==  'Reverse' :
-        eqe_s = eqe_s[(eqe_s['Mechanism'] == ' Reverse')]
-
-    elif fault_mechnanism ==  'Reverse-Oblique' :
-        eqe_s = eqe_s[(eqe_s['Mechanism'] == ' Reverse Oblique')]
-
-    elif fault_mechnanism ==  'Normal-Oblique' :
-        eqe_s = eqe_s[(eqe_s['Mechanism'] == ' Normal Oblique')]
-
-    elif fault_mechnanism == 'Oblique':
-        eqe_s = eqe_s[((eqe_s['Mechanism'] == ' Normal Oblique') | (eqe_s['Mechanism'] == ' Reverse Oblique'))]
-
-    else : 
+    mechanisms = mechanismNames.get(fault_mechnanism)
+    if mechanisms is None:
         print("Invalid Mechanism!")
     
     # Select 11 records with minimal difference and 3 from same earthquake
-    first_three_list = []
-
-    for counter, temp_df in eqe_s.groupby( by = "EarthquakeName") :
-        [first_three_list.append(item) for item in  temp_df["RecordSequenceNumber"][:3].to_list() ]
+    rows = queryMetadata(ranges, mechanisms=mechanisms, pulse=pulse, perEvent=3)
         
-    eqe_s_filtered = eqe_s[ eqe_s["RecordSequenceNumber"].isin( first_three_list )]
+    eqe_s_filtered = eqe_df.iloc[ rows ]
 
     # Selected Record Sequence Numbers
     rsn_selected = eqe_s_filtered['RecordSequenceNumber'].tolist()
 
-    # Read Spectral Data
-    spectral_data_x = pd.read_csv("applications/seisscale/data/spectral_x.csv")
-    spectral_data_y = pd.read_csv("applications/seisscale/data/spectral_y.csv")
-
-    spectra_selected_x = spectral_data_x.loc[spectral_data_x['RSN'].isin(rsn_selected)]
-    spectra_selected_y = spectral_data_y.loc[spectral_data_y['RSN'].isin(rsn_selected)]
-
-    t_str = spectra_selected_x.columns.tolist()[2:]
-    t = []
-    for i in t_str:
-        t.append(float(i))
+    # Spectral Data of the selected records, one row per record
+    t = loadDatabase()['periods'].tolist()
+    spectra_x = gatherSpectra('x', rsn_selected)
+    spectra_y = gatherSpectra('y', rsn_selected)
 
     # Reverse the DataFrames
-    eqe_selected_x = pd.DataFrame()
-    eqe_selected_x.insert(0, 'T', t)
-    eqe_selected_y = pd.DataFrame()
-    eqe_selected_y.insert(0, 'T', t)
-
-    for i in rsn_selected:
-        eqe_selected_x[ i ] = spectra_selected_x.loc[spectra_selected_x['RSN'] == i].iloc[0].tolist()[2:]
-        eqe_selected_y[ i ] = spectra_selected_y.loc[spectra_selected_y['RSN'] == i].iloc[0].tolist()[2:]
+    eqe_selected_x = spectraTable(t, rsn_selected, spectra_x)
+    eqe_selected_y = spectraTable(t, rsn_selected, spectra_y)
 
     # Calculation of Geometric Mean of the Records
-    geo_mean_df = pd.DataFrame()
-    geo_mean_df['T'] = t
-
-    for i in rsn_selected:
-        geo_mean_df[i ] = [(x*y)**(1/2) for x,y in zip(eqe_selected_x[ i ].to_list(), eqe_selected_y[ i ].to_list())]
+    geo_mean = (spectra_x * spectra_y) ** (1/2)
 
     # range of interest
-    geo_mean_df_range = geo_mean_df[ ( geo_mean_df["T"] >= 0.2 * period) & ( geo_mean_df["T"] <= 1.5 * period ) ]
+    periods = np.array(t)
+    range_mask = (periods >= 0.2 * period) & (periods <= 1.5 * period)
     target_range = target_spectrum[ ( target_spectrum["T"] >= 0.2 * period) & ( target_spectrum["T"] <= 1.5 * period )]
 
     # Create 2D Arrays for Records
@@ -232,13 +210,14 @@ def recordSelection(magnitude_range: str = '4 9',
 
     target_array = np.column_stack((target_range['T'], target_range['Sa']))
 
-    for i in rsn_selected:
-        df.append(similaritymeasures.frechet_dist(np.column_stack((geo_mean_df_range['T'], geo_mean_df_range[i])), target_array))
-        area.append(similaritymeasures.area_between_two_curves(np.column_stack((geo_mean_df_range['T'], geo_mean_df_range[i])), target_array))
-        cl.append(similaritymeasures.curve_length_measure(np.column_stack((geo_mean_df_range['T'], geo_mean_df_range[i])), target_array))
-        dtw.append(similaritymeasures.dtw(np.column_stack((geo_mean_df_range['T'], geo_mean_df_range[i])), target_array)[0])
-        mae.append(similaritymeasures.mae(np.column_stack((geo_mean_df_range['T'], geo_mean_df_range[i])), target_array))
-        mse.append(similaritymeasures.mse(np.column_stack((geo_mean_df_range['T'], geo_mean_df_range[i])), target_array))
+    for row in range(len(rsn_selected)):
+        record_array = np.column_stack((periods[range_mask], geo_mean[row, range_mask]))
+        df.append(similaritymeasures.frechet_dist(record_array, target_array))
+        area.append(similaritymeasures.area_between_two_curves(record_array, target_array))
+        cl.append(similaritymeasures.curve_length_measure(record_array, target_array))
+        dtw.append(similaritymeasures.dtw(record_array, target_array)[0])
+        mae.append(similaritymeasures.mae(record_array, target_array))
+        mse.append(similaritymeasures.mse(record_array, target_array))
 
     similarities_df['DF'] = df
     similarities_df['AREA'] = area
@@ -261,105 +240,58 @@ def recordSelection(magnitude_range: str = '4 9',
 
 def amplitudeScaling(key_list, target , period, targetShift, period_range_min, period_range_max, components = 'srss'):
 
-    eqe_df = pd.read_csv("applications/seisscale/data/meta_data-R1.csv")
-
-    spectral_data_x = pd.read_csv("applications/seisscale/data/spectral_x.csv")
-    spectral_data_y = pd.read_csv("applications/seisscale/data/spectral_y.csv")
-
-    selected_x = spectral_data_x.loc[spectral_data_x['RSN'].isin(key_list)]
-    selected_y = spectral_data_y.loc[spectral_data_y['RSN'].isin(key_list)]
-
-    t_str = selected_x.columns.tolist()[2:]
-    t = []
-    for i in t_str:
-        t.append(float(i))
+    # Spectral Data of the selected records, one row per record
+    t = loadDatabase()['periods'].tolist()
+    spectra_x = gatherSpectra('x', key_list)
+    spectra_y = gatherSpectra('y', key_list)
 
     rsn_selected = key_list
 
-    eqe_selected_x = pd.DataFrame()
-    eqe_selected_x.insert(0, 'T', t)
-    eqe_selected_y = pd.DataFrame()
-    eqe_selected_y.insert(0, 'T', t)
-
-    for i in rsn_selected:
-        eqe_selected_x[ i ] = selected_x.loc[selected_x['RSN'] == i].iloc[0].tolist()[2:]
-        eqe_selected_y[ i ] = selected_y.loc[selected_y['RSN'] == i].iloc[0].tolist()[2:] 
-
-    # Create Geometric Mean, SRSS Mean, RotD50 and RotD100 Functions
+    # Create Geometric Mean, SRSS Mean, RotD50 and RotD100 Functions, on (records, periods) arrays
     def geomean_func(acc_1 , acc_2):
-        geo_mean = []
-        for i , j in zip(acc_1 , acc_2):
-            geo_mean.append( round( ( i * j)**(0.5) , 4 ) )
-
-        return geo_mean
+        return roundValues( ( acc_1 * acc_2 )**(0.5) )
 
     def srss_func(acc_1 , acc_2):
-        srss_mean = []
-        for i , j in zip(acc_1 , acc_2):
-            srss_mean.append( round( ( i**2 + j**2)**(0.5) , 4 ) )
-
-        return srss_mean
+        return roundValues( ( acc_1**2 + acc_2**2 )**(0.5) )
 
     def rotD50_func(acc_1, acc_2):
-        rot50 = []
-        for i,j in zip(acc_1, acc_2):
-            rot50.append(np.percentile(np.array([i, j]), 50))
-
-        return rot50
+        return np.percentile(np.stack([acc_1, acc_2]), 50, axis=0)
 
     def rotD100_func(acc_1, acc_2):
-        rot100 = []
-        for i,j in zip(acc_1, acc_2):
-            rot100.append(np.percentile(np.array([i, j]), 100))
-        
-        return rot100
+        return np.percentile(np.stack([acc_1, acc_2]), 100, axis=0)
 
     # Find Geometric Mean
-    geo_mean_df = pd.DataFrame()
-    geo_mean_df.insert(0, 'T', t)
-
-    for i in rsn_selected:
-        geo_mean_df[  i ] = geomean_func( eqe_selected_x[ i ].tolist() , eqe_selected_y[ i ].tolist() )    
+    geo_mean = geomean_func( spectra_x , spectra_y )
     
     # Slice the period range from target and geomean spectra
     filtered_target = target[(target["T"] >= period_range_min*float(period)) & (target["T"] <= period_range_max*float(period))]
 
-    filtered_geo_mean = geo_mean_df[(geo_mean_df["T"] >= period_range_min*float(period)) & (geo_mean_df["T"] <= period_range_max*float(period))]
+    periods = np.array(t)
+    range_mask = (periods >= period_range_min*float(period)) & (periods <= period_range_max*float(period))
 
-    # Find the differences in period range 
-    geo_sf_dict = {}
-    num = 0
-    denom = 0
-    for rsn in key_list:
-        for x,y in zip(filtered_geo_mean[ rsn ].to_list(), filtered_target[ "Sa" ].to_list()):
-            num += x*y
-            denom += x**2
-        geo_sf_dict[rsn] = (num/denom)
+    # Find the differences in period range, the sums run on from one record to the next
+    target_values = filtered_target[ "Sa" ].to_numpy(dtype=float)
+    count = min(int(range_mask.sum()), len(target_values))
+    filtered_geo_mean = geo_mean[:, range_mask][:, :count]
+    num = np.cumsum( filtered_geo_mean * target_values[:count] )
+    denom = np.cumsum( filtered_geo_mean**2 )
+    ends = np.arange(1, len(key_list) + 1) * count - 1
+    geo_sf_dict = dict(zip(key_list, (num[ends] / denom[ends]).tolist()))
+    geo_sf = np.array(list(geo_sf_dict.values()))[:, None]
 
     # First scaling= Geomen x geo_sf
-    multiplied_selected_x = eqe_selected_x.copy()
-    multiplied_selected_y = eqe_selected_y.copy()
-
-    for rsn in rsn_selected:
-        multiplied_selected_x[ rsn ] = geo_sf_dict[ rsn ] * multiplied_selected_x[ rsn ]
-        multiplied_selected_y[ rsn ] = geo_sf_dict[ rsn ] * multiplied_selected_y[ rsn ]
+    multiplied_x = geo_sf * spectra_x
+    multiplied_y = geo_sf * spectra_y
+    multiplied_selected_x = spectraTable(t, rsn_selected, multiplied_x)
+    multiplied_selected_y = spectraTable(t, rsn_selected, multiplied_y)
 
-    geo_mean_1st_scaled_df = pd.DataFrame()
-    geo_mean_1st_scaled_df["T"] = geo_mean_df["T"]
-    for rsn in rsn_selected : 
-        geo_mean_1st_scaled_df[ rsn ] = geo_sf_dict[ rsn] *  geo_mean_df[ rsn]
+    geo_mean_1st_scaled_df = spectraTable(t, rsn_selected, geo_sf * geo_mean)
     geo_mean_1st_scaled_df[ "Mean" ]  = geo_mean_1st_scaled_df[rsn_selected].mean( axis = 1 )  
 
     #################################### Use SRSS Function To Find Spectral Component Mean ####################################  
 
     if components == 'srss':    
-        srss_mean_df = pd.DataFrame()
-        srss_mean_df.insert(0, 'T', t)
-        for rsn in rsn_selected:
-            srss_mean_df[  rsn ] = srss_func(multiplied_selected_x[ rsn ].tolist(), multiplied_selected_y[ rsn ].tolist())
-        rsn_str = []
-        for i in rsn_selected:
-            rsn_str.append( str(i))
+        srss_mean_df = spectraTable(t, rsn_selected, srss_func(multiplied_x, multiplied_y))
                     
         srss_mean_df['Mean'] = srss_mean_df[ key_list].mean(axis=1)   
         
@@ -401,31 +333,17 @@ def amplitudeScaling(key_list, target , period, targetShift, period_range_min, p
             sf_dict[ key ] = round( SF_ortalama * val * inc , 4 )
 
         # Obtain the scaled spectral values
-        eqe_selected_scaled_x , eqe_selected_scaled_y = pd.DataFrame() , pd.DataFrame()
-        srss_mean_scaled_df = pd.DataFrame()
-        srss_mean_scaled_df["T"] = t 
-        for rsn in rsn_selected :
-            eqe_selected_scaled_x[ rsn ] = sf_dict[ rsn ] * eqe_selected_x[ rsn]
-            eqe_selected_scaled_y[ rsn ] = sf_dict[ rsn ] * eqe_selected_y[ rsn]
-            srss_mean_scaled_df[  rsn ] = srss_func( eqe_selected_scaled_x[ rsn ].tolist(), eqe_selected_scaled_y[ rsn ].tolist())
+        sf = np.array([ sf_dict[ rsn ] for rsn in rsn_selected ])[:, None]
+        srss_mean_scaled_df = spectraTable(t, rsn_selected, srss_func( sf * spectra_x, sf * spectra_y ))
         
         srss_mean_scaled_df["Mean"] = srss_mean_scaled_df[ rsn_selected ].mean( axis = 1 )
-        
-        for rsn in rsn_selected : 
-            temp_df = eqe_df[ eqe_df['RecordSequenceNumber'] == rsn]
 
         return sf_dict, multiplied_selected_x, multiplied_selected_y, geo_mean_1st_scaled_df, srss_mean_df, srss_mean_scaled_df
 
             #################################### Use RotD50 Function To Find Spectral Component Mean ####################################
 
     elif components == 'rotd50':    
-        rotd50_mean_df = pd.DataFrame()
-        rotd50_mean_df.insert(0, 'T', t)
-        for rsn in rsn_selected:
-            rotd50_mean_df[  rsn ] = rotD50_func(multiplied_selected_x[ rsn ].tolist(), multiplied_selected_y[ rsn ].tolist())
-        rsn_str = []
-        for i in rsn_selected:
-            rsn_str.append( str(i))
+        rotd50_mean_df = spectraTable(t, rsn_selected, rotD50_func(multiplied_x, multiplied_y))
                     
         rotd50_mean_df['Mean'] = rotd50_mean_df[ key_list].mean(axis=1)  
         
@@ -467,31 +385,17 @@ def amplitudeScaling(key_list, target , period, targetShift, period_range_min, p
             sf_dict[ key ] = round( SF_ortalama * val * inc , 4 )
         
         # Obtain the scaled spectral values
-        eqe_selected_scaled_x , eqe_selected_scaled_y = pd.DataFrame() , pd.DataFrame()
-        rotd50_mean_scaled_df = pd.DataFrame()
-        rotd50_mean_scaled_df["T"] = t 
-        for rsn in rsn_selected :
-            eqe_selected_scaled_x[ rsn ] = sf_dict[ rsn ] * eqe_selected_x[ rsn]
-            eqe_selected_scaled_y[ rsn ] = sf_dict[ rsn ] * eqe_selected_y[ rsn]
-            rotd50_mean_scaled_df[  rsn ] = rotD50_func( eqe_selected_scaled_x[ rsn ].tolist(), eqe_selected_scaled_y[ rsn ].tolist())
+        sf = np.array([ sf_dict[ rsn ] for rsn in rsn_selected ])[:, None]
+        rotd50_mean_scaled_df = spectraTable(t, rsn_selected, rotD50_func( sf * spectra_x, sf * spectra_y ))
         
         rotd50_mean_scaled_df["Mean"] = rotd50_mean_scaled_df[ rsn_selected ].mean( axis = 1 )
-        
-        for rsn in rsn_selected : 
-            temp_df = eqe_df[ eqe_df['RecordSequenceNumber'] == rsn]
 
         return sf_dict, multiplied_selected_x, multiplied_selected_y, geo_mean_1st_scaled_df, rotd50_mean_df, rotd50_mean_scaled_df
 
     #################################### Use RotD100 Function To Find Spectral Component Mean ####################################
 
     elif components == 'rotd100':    
-        rotd100_mean_df = pd.DataFrame()
-        rotd100_mean_df.insert(0, 'T', t)
-        for rsn in rsn_selected:
-            rotd100_mean_df[  rsn ] = rotD100_func(multiplied_selected_x[ rsn ].tolist(), multiplied_selected_y[ rsn ].tolist())
-        rsn_str = []
-        for i in rsn_selected:
-            rsn_str.append( str(i))
+        rotd100_mean_df = spectraTable(t, rsn_selected, rotD100_func(multiplied_x, multiplied_y))
                     
         rotd100_mean_df['Mean'] = rotd100_mean_df[ key_list].mean(axis=1)    
         
@@ -533,17 +437,9 @@ def amplitudeScaling(key_list, target , period, targetShift, period_range_min, p
             sf_dict[ key ] = round( SF_ortalama * val * inc , 4 )
         
         # Obtain the scaled spectral values
-        eqe_selected_scaled_x , eqe_selected_scaled_y = pd.DataFrame() , pd.DataFrame()
-        rotd100_mean_scaled_df = pd.DataFrame()
-        rotd100_mean_scaled_df["T"] = t 
-        for rsn in rsn_selected :
-            eqe_selected_scaled_x[ rsn ] = sf_dict[ rsn ] * eqe_selected_x[ rsn]
-            eqe_selected_scaled_y[ rsn ] = sf_dict[ rsn ] * eqe_selected_y[ rsn]
-            rotd100_mean_scaled_df[  rsn ] = rotD100_func( eqe_selected_scaled_x[ rsn ].tolist(), eqe_selected_scaled_y[ rsn ].tolist())
+        sf = np.array([ sf_dict[ rsn ] for rsn in rsn_selected ])[:, None]
+        rotd100_mean_scaled_df = spectraTable(t, rsn_selected, rotD100_func( sf * spectra_x, sf * spectra_y ))
         
         rotd100_mean_scaled_df["Mean"] = rotd100_mean_scaled_df[ rsn_selected ].mean( axis = 1 )
-        
-        for rsn in rsn_selected : 
-            temp_df = eqe_df[ eqe_df['RecordSequenceNumber'] == rsn]
 
         return sf_dict, multiplied_selected_x, multiplied_selected_y, geo_mean_1st_scaled_df, rotd100_mean_df, rotd100_mean_scaled_df
\ No newline at end of file
@@ -1,4 +1,4 @@
-from dash import html, dcc, callback, Output, Input, State
+from dash import html, dcc, callback, Output, Input, State, Patch, clientside_callback, ClientsideFunction
 from dash.exceptions import PreventUpdate
 import dash_leaflet as dl
 import plotly.graph_objects as go
@@ -6,6 +6,7 @@ import pandas as pd
 import dash_bootstrap_components as dbc
 from applications.tbec.tbecFunctions import tbecTargetSpectrum
 from components.navbar import navbar
+from components.figures import figureTrace
 
 # Title
 tbecTitle = html.H1("🔸TBEC-2018 Response Spectrum Creator", className='fs-1 mx-2 mb-3 mt-3 text-center')
@@ -133,28 +134,19 @@ def layout():
         dcc.Download(id="download-dataframe-xlsx")
     ])
 
-# add marker to the map
-@callback(
+# add marker to the map, runs in the browser (assets/clientside.js)
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='clickMarker'),
     Output("layer", "children"),
     [Input("map", "click_lat_lng")],
 )
-def map_click(click_lat_lng):
-    if click_lat_lng:
-        marker = dl.Marker(position=click_lat_lng)
-        return [marker]
-    return []
 
 # get coordinates from the click
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace='seiskit', function_name='clickCoordinates'),
     [Output("latitudeInput", "value"), Output("longitudeInput", "value")],
     [Input("map", "click_lat_lng")]
 )
-def click_coord(click_lat_lng):
-    if click_lat_lng and len(click_lat_lng) == 2:
-        lat, lng = click_lat_lng
-        return float(round(lat, 4)), float(round(lng, 4))
-    else:
-        raise PreventUpdate
     
 # add functionality to response button
 @callback(
@@ -169,23 +161,23 @@ def click_coord(click_lat_lng):
         State('longitudeInput', 'value'),
         State('soilTypeInput', 'value'),
         State('intensityLevelInput', 'value'),
-        State('horizontalFig', 'figure'),  
-        State('verticalFig', 'figure'),
     ]
 )
-def update_spectral_values_and_figures(n_clicks, latitude, longitude, soil_type, intensity_level, horizotanlFig, verticalFig):
+def update_spectral_values_and_figures(n_clicks, latitude, longitude, soil_type, intensity_level):
     if not n_clicks:
         raise PreventUpdate
 
     returnedSpectralValues, tList, saList, sadList, spectralValuesDict = tbecTargetSpectrum(latitude, longitude, soil_type, intensity_level)
         
     # clean the graphs
+    horizotanlFig = Patch()
+    verticalFig = Patch()
     horizotanlFig['data'] = []
     verticalFig['data'] = []
     
     # add traces
-    horizontalTrace = go.Scatter(x=tList, y=saList, line=dict(color="#000080"))
-    verticalTrace = go.Scatter(x=tList, y=sadList, line=dict(color="#000080"))
+    horizontalTrace = figureTrace(x=tList, y=saList, line=dict(color="#000080"))
+    verticalTrace = figureTrace(x=tList, y=sadList, line=dict(color="#000080"))
     
     horizotanlFig['data'].append(horizontalTrace)
     verticalFig['data'].append(verticalTrace)
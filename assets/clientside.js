@@ -0,0 +1,81 @@
+// presentational callbacks that run in the browser, see clientside_callback in the apps
+(function () {
+    var show = {display: 'block'};
+    var hide = {display: 'none'};
+
+    // marker and rounded coordinates of a map click
+    function clickMarker(clickLatLng) {
+        if (!clickLatLng) {
+            return [];
+        }
+        return [{namespace: 'dash_leaflet', type: 'Marker', props: {position: clickLatLng}}];
+    }
+
+    function clickCoordinates(clickLatLng) {
+        if (!clickLatLng || clickLatLng.length !== 2) {
+            throw window.dash_clientside.PreventUpdate;
+        }
+        return clickLatLng.map(function (value) {
+            return Math.round(value * 1e4) / 1e4;
+        });
+    }
+
+    // styles of the inputs shown for a selected option, no update for unknown options
+    function toggle(styles, value, count) {
+        if (!(value in styles)) {
+            return new Array(count).fill(window.dash_clientside.no_update);
+        }
+        return styles[value];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        seiskit: {
+            // homepage redirect of the router
+            redirect: function (pathname) {
+                if (pathname === '/' || pathname === '/home') {
+                    return 'https://seiskit.com/applications';
+                }
+                return window.dash_clientside.no_update;
+            },
+
+            // processor
+            showOrder: function (detrendMethod) {
+                return toggle({
+                    'Linear': [hide, hide],
+                    'Polynomial': [show, show],
+                }, detrendMethod, 2);
+            },
+
+            filterInputArea: function (method) {
+                return toggle({
+                    'Band-Pass': [show, show, show, show],
+                    'High-Pass': [hide, hide, show, show],
+                    'Low-Pass': [show, show, hide, hide],
+                }, method, 4);
+            },
+
+            periodGridArea: function (grid) {
+                if (grid === 'User-Defined') {
+                    return [hide, show];
+                }
+                if (grid === 'NGA-West2') {
+                    return [hide, hide];
+                }
+                return [show, hide];
+            },
+
+            // seisscale
+            spectrumInputArea: function (type) {
+                return toggle({
+                    'TBEC-2018': [show, hide, hide, show],
+                    'ASCE7-22': [hide, show, hide, show],
+                    'User-Defined': [hide, hide, show, show],
+                }, type, 4);
+            },
+
+            // tbec and asce maps
+            clickMarker: clickMarker,
+            clickCoordinates: clickCoordinates,
+        },
+    });
+})();
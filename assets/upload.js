@@ -0,0 +1,128 @@
+// chunked, resumable uploads of the earthquake data processor
+(function () {
+    var uploadUrl = '/eqprocessor/upload';
+    var maxSize = 200 * 1024 * 1024;
+
+    function setHandle(data) {
+        window.dash_clientside.set_props('uploadHandleStore', {data: data});
+    }
+
+    function setProgress(text) {
+        var progress = document.getElementById('uploadProgress');
+        if (progress) {
+            progress.textContent = text;
+        }
+    }
+
+    function readJson(response) {
+        return response.json().then(function (body) {
+            if (!response.ok && response.status !== 409) {
+                throw new Error(body.error || 'Upload failed.');
+            }
+            return body;
+        });
+    }
+
+    // the same file keeps its upload id, so a broken upload continues where it stopped
+    function resumeKey(file) {
+        return 'seiskit-upload:' + file.name + ':' + file.size + ':' + file.lastModified;
+    }
+
+    function startUpload(file) {
+        var saved = window.localStorage.getItem(resumeKey(file));
+        if (saved) {
+            return fetch(uploadUrl + '/' + saved).then(function (response) {
+                if (!response.ok) {
+                    window.localStorage.removeItem(resumeKey(file));
+                    return startUpload(file);
+                }
+                return response.json();
+            });
+        }
+
+        return fetch(uploadUrl, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({filename: file.name, size: file.size})
+        }).then(readJson).then(function (body) {
+            window.localStorage.setItem(resumeKey(file), body.uploadId);
+            return body;
+        });
+    }
+
+    function sendChunks(file, uploadId, offset, chunkSize) {
+        setProgress('Uploading ' + file.name + ' • ' + Math.floor(100 * offset / Math.max(file.size, 1)) + '%');
+        if (offset >= file.size) {
+            return Promise.resolve();
+        }
+
+        var chunk = file.slice(offset, Math.min(offset + chunkSize, file.size));
+        return fetch(uploadUrl + '/' + uploadId + '?offset=' + offset, {
+            method: 'PUT',
+            headers: {'Content-Type': 'application/octet-stream'},
+            body: chunk
+        }).then(readJson).then(function (body) {
+            return sendChunks(file, uploadId, body.offset, chunkSize);
+        });
+    }
+
+    function upload(file) {
+        var chunkSize = 4 * 1024 * 1024;
+
+        if (file.size > maxSize) {
+            setHandle({error: 'File is larger than 200MB.', filename: file.name});
+            return;
+        }
+
+        startUpload(file).then(function (body) {
+            return sendChunks(file, body.uploadId, body.offset || 0, Math.min(chunkSize, body.chunkSize || chunkSize)).then(function () {
+                setProgress('Processing ' + file.name);
+                return fetch(uploadUrl + '/' + body.uploadId + '/finish', {method: 'POST'});
+            });
+        }).then(readJson).then(function (body) {
+            window.localStorage.removeItem(resumeKey(file));
+            setProgress('');
+            setHandle(body.error ? {error: body.error, filename: file.name} : body);
+        }).catch(function (error) {
+            setProgress('');
+            setHandle({error: error.message, filename: file.name});
+        });
+    }
+
+    function inUploadArea(event) {
+        return event.target.closest && event.target.closest('#uploadData');
+    }
+
+    document.addEventListener('click', function (event) {
+        if (!inUploadArea(event)) {
+            return;
+        }
+
+        var input = document.createElement('input');
+        input.type = 'file';
+        input.accept = '.AT2,.asc';
+        input.addEventListener('change', function () {
+            if (input.files.length) {
+                upload(input.files[0]);
+            }
+        });
+        input.click();
+    });
+
+    document.addEventListener('dragover', function (event) {
+        if (inUploadArea(event)) {
+            event.preventDefault();
+        }
+    });
+
+    document.addEventListener('drop', function (event) {
+        if (!inUploadArea(event)) {
+            return;
+        }
+
+        event.preventDefault();
+        if (event.dataTransfer.files.length) {
+            upload(event.dataTransfer.files[0]);
+        }
+    });
+})();
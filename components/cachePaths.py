@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+# folders shared by the workers of a machine, kept free of dash so numeric code can import them
+
+# background callbacks run in subprocesses, their results and progress go through this folder
+jobDirectory = os.environ.get('SEISKIT_JOB_CACHE', os.path.join(tempfile.gettempdir(), 'seiskit-jobs'))
+
+# on-disk tier of the spectrum cache, spectra computed in background jobs reach the workers through it,
+# set SEISKIT_SPECTRUM_CACHE to move it or to an empty value to turn it off
+spectrumDirectory = os.environ.get('SEISKIT_SPECTRUM_CACHE', os.path.join(jobDirectory, 'spectra')) or None
+
+# parsed records of the processor page as .npz, read back by any worker, set SEISKIT_RECORD_CACHE to move it
+# or to an empty value to keep records in the memory of one worker only
+recordDirectory = os.environ.get('SEISKIT_RECORD_CACHE', os.path.join(tempfile.gettempdir(), 'seiskit-records')) or None
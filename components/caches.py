@@ -0,0 +1,95 @@
+import os
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+
+class LRUCache:
+    """
+    Thread safe in-memory cache, least recently used items are evicted first.
+
+    Args:
+        maxItems (int): number of items kept
+        ttl (float): seconds an item is kept after its last use, None to keep it until evicted
+        counters (tuple): names of the counters kept next to hits and misses, e.g. 'diskHits'
+    """
+
+    # init function
+    def __init__(self, maxItems=64, ttl=None, counters=()):
+        self.maxItems = maxItems
+        self.ttl = ttl
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+        # counters, hits and misses of get plus the ones added with count
+        self.counters = dict.fromkeys(('hits', 'misses') + tuple(counters), 0)
+
+    def expire(self):
+        # drop items not used within ttl, called with the lock held
+        if self.ttl is None:
+            return
+
+        now = time.monotonic()
+        while self.items:
+            lastUsed, value = next(iter(self.items.values()))
+            if now - lastUsed <= self.ttl:
+                break
+            self.items.popitem(last=False)
+
+    def get(self, key, countMiss=True):
+        # value of key, None if it is not cached
+        with self.lock:
+            self.expire()
+
+            if key not in self.items:
+                if countMiss:
+                    self.counters['misses'] += 1
+                return None
+
+            lastUsed, value = self.items[key]
+            self.items[key] = (time.monotonic(), value)
+            self.items.move_to_end(key)
+            self.counters['hits'] += 1
+
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = (time.monotonic(), value)
+            self.items.move_to_end(key)
+            self.expire()
+            while len(self.items) > self.maxItems:
+                self.items.popitem(last=False)
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, size=len(self.items), maxItems=self.maxItems)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.counters = {counter: 0 for counter in self.counters}
+
+def saveArrays(path, **arrays):
+    """
+    Writes arrays to an .npz file, written next to path and renamed, so readers never see a partial file.
+
+    Returns:
+        bool: False if the file could not be written
+    """
+    handle, temporary = tempfile.mkstemp(suffix='.npz', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        return False
+
+    return True
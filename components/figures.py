@@ -0,0 +1,161 @@
+import os
+import re
+import base64
+import numpy as np
+
+# points sent to the browser per trace
+maxPlotPoints = 4000
+
+def minMaxDownsample(x, y, maxPoints=maxPlotPoints):
+    """
+    Keeps the minimum and maximum of every bucket in time order, so peaks are never lost.
+
+    Args:
+        x (np.ndarray): sorted x values
+        y (np.ndarray): y values
+        maxPoints (int): maximum number of points returned
+    Returns:
+        tuple: downsampled x and y
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+
+    if n <= maxPoints:
+        return x, y
+
+    # equal buckets, the last one is padded with its final sample, two points per bucket
+    # plus the first and last samples stay within maxPoints
+    size = -(-n // max((maxPoints - 2) // 2, 1))
+    buckets = -(-n // size)
+    padded = np.empty(buckets * size, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    blocks = padded.reshape(buckets, size)
+
+    offsets = np.arange(buckets) * size
+    lows = np.minimum(offsets + blocks.argmin(axis=1), n - 1)
+    highs = np.minimum(offsets + blocks.argmax(axis=1), n - 1)
+
+    # both extremes of a bucket, in the order they occur
+    indices = np.sort(np.concatenate([lows, highs]))
+    indices = indices[np.concatenate([[True], np.diff(indices) > 0])]
+
+    # first and last samples keep the full extent of the trace
+    indices = np.union1d(indices, [0, n - 1])
+
+    return x[indices], y[indices]
+
+def visibleWindow(x, y, xRange=None, maxPoints=maxPlotPoints):
+    """
+    Downsampled samples inside an x range, one extra sample at each side keeps the line to the edges.
+
+    Args:
+        x (np.ndarray): sorted x values
+        y (np.ndarray): y values
+        xRange (list): [start, end] of the visible window, None for all samples
+        maxPoints (int): maximum number of points returned
+    Returns:
+        tuple: downsampled x and y
+    """
+    if xRange is not None:
+        first = max(int(np.searchsorted(x, xRange[0], side='left')) - 1, 0)
+        last = min(int(np.searchsorted(x, xRange[1], side='right')) + 1, len(x))
+        x, y = x[first:last], y[first:last]
+
+    return minMaxDownsample(x, y, maxPoints)
+
+def relayoutRange(relayoutData, axis='xaxis'):
+    """
+    Visible range of an axis from dcc.Graph relayoutData.
+
+    Returns:
+        list: [start, end], None when the axis was reset to autorange, False if the axis did not change
+    """
+    if not relayoutData:
+        return False
+
+    if relayoutData.get(f'{axis}.autorange'):
+        return None
+
+    if f'{axis}.range[0]' in relayoutData and f'{axis}.range[1]' in relayoutData:
+        return [float(relayoutData[f'{axis}.range[0]']), float(relayoutData[f'{axis}.range[1]'])]
+
+    if f'{axis}.range' in relayoutData:
+        return [float(value) for value in relayoutData[f'{axis}.range']]
+
+    return False
+
+def bundledPlotlyVersion():
+    # version of the plotly.js shipped with dash, from the header of the bundle
+    try:
+        from dash import dcc
+        with open(os.path.join(os.path.dirname(dcc.__file__), 'plotly.min.js')) as file:
+            header = file.read(200)
+    except (ImportError, OSError):
+        return (0, 0)
+
+    match = re.search(r'plotly\.js v(\d+)\.(\d+)', header)
+
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+# base64 typed arrays ({dtype, bdata}) are decoded by plotly.js 2.28 and later
+typedArraysSupported = bundledPlotlyVersion() >= (2, 28)
+
+# traces with more points than this are drawn with webgl
+glThreshold = 1000
+
+def typedArray(values):
+    """
+    Compact figure payload of a numeric array.
+
+    Base64 float32 typed array when the bundled plotly.js decodes it, otherwise a list of
+    float32 precision numbers, about half the json of full float64 reprs. A 2d array is one
+    typed array with its shape, or nested lists.
+    """
+    values = np.asarray(values, dtype=np.float32)
+
+    if typedArraysSupported:
+        array = {'dtype': 'f4', 'bdata': base64.b64encode(np.ascontiguousarray(values).tobytes()).decode('ascii')}
+        if values.ndim > 1:
+            array['shape'] = ','.join(str(length) for length in values.shape)
+        return array
+
+    # shortest float32 repr, parsed back so json writes the short form
+    return values.astype(str).astype(float).tolist()
+
+def figureTrace(x, y, threshold=None, **kwargs):
+    """
+    Line trace as a plain dict, webgl above the point threshold.
+
+    Args:
+        x (np.ndarray): x values
+        y (np.ndarray): y values
+        threshold (int): points above which scattergl is used, glThreshold by default
+        **kwargs: other trace attributes, e.g. name, line, mode
+    Returns:
+        dict: plotly trace
+    """
+    threshold = glThreshold if threshold is None else threshold
+    trace = {
+        'type': 'scattergl' if len(y) > threshold else 'scatter',
+        'x': typedArray(x),
+        'y': typedArray(y),
+    }
+    trace.update(kwargs)
+
+    return trace
+
+def heatmapTrace(x, y, z, **kwargs):
+    """
+    Heatmap trace as a plain dict with compact x, y and z.
+    """
+    trace = {
+        'type': 'heatmap',
+        'x': typedArray(x),
+        'y': typedArray(y),
+        'z': typedArray(np.atleast_2d(z)),
+    }
+    trace.update(kwargs)
+
+    return trace
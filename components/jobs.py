@@ -0,0 +1,108 @@
+import os
+import time
+import functools
+import diskcache
+import psutil
+from dash import DiskcacheManager
+from components.cachePaths import jobDirectory
+
+# background callbacks run in subprocesses, their results and progress go through jobDirectory
+jobCache = diskcache.Cache(jobDirectory)
+
+# results nobody collected are dropped after an hour
+backgroundManager = DiskcacheManager(jobCache, expire=3600)
+
+# heavy jobs running at once for every server worker
+maxHeavyJobs = int(os.environ.get('SEISKIT_MAX_JOBS', 2))
+
+def jobAlive(pid):
+    # a killed job stays a zombie until its worker reaps it
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+class JobSlot:
+    """
+    One of the maxHeavyJobs slots of a worker, held while a background job runs.
+
+    A slot is a job cache key holding the pid of its job, so a job killed on cancel
+    gives its slot back as soon as the process is gone.
+
+    Args:
+        setProgress (callable): progress setter of the background callback, told while waiting
+        message (str): progress shown while waiting for a slot
+        interval (float): seconds between tries
+    """
+
+    # init function
+    def __init__(self, setProgress=None, message='Waiting for a free worker...', interval=0.25):
+        self.setProgress = setProgress
+        self.message = message
+        self.interval = interval
+
+        # jobs are started by the worker that received the callback
+        self.worker = os.getppid()
+        self.key = None
+
+    def acquire(self):
+        pid = os.getpid()
+
+        with jobCache.transact():
+            for slot in range(maxHeavyJobs):
+                key = f'heavyJob:{self.worker}:{slot}'
+                holder = jobCache.get(key)
+                if holder is None or not jobAlive(holder):
+                    jobCache.set(key, pid)
+                    return key
+
+        return None
+
+    def release(self):
+        with jobCache.transact():
+            if jobCache.get(self.key) == os.getpid():
+                jobCache.delete(self.key)
+
+        self.key = None
+
+    def __enter__(self):
+        self.key = self.acquire()
+
+        if self.key is None and self.setProgress is not None:
+            self.setProgress(self.message)
+
+        while self.key is None:
+            time.sleep(self.interval)
+            self.key = self.acquire()
+
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+        return False
+
+def heavyJob(message, check=None):
+    """
+    Runs a background callback in a job slot of its worker.
+
+    Args:
+        message (str): progress shown once the job has a slot
+        check (callable): cheap validation of the callback arguments, run before a slot is
+            taken, raises PreventUpdate for inputs that would not start a job
+    Returns:
+        callable: decorator, the callback takes the progress setter as its first argument
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(setProgress, *args, **kwargs):
+            if check is not None:
+                check(*args, **kwargs)
+
+            with JobSlot(setProgress):
+                setProgress(message)
+                return function(setProgress, *args, **kwargs)
+
+        return wrapper
+
+    return decorator